@@ -2,14 +2,101 @@
 This module defines the core data classes used for text cleaning and preprocessing.
 
 Classes:
+    - CleanerPipeline: Precompiled cleaning steps built once from the remove-words file.
     - CleanSentences: Handles loading and preprocessing of sentence data.
     - CleanNames: Handles loading and cleaning of name data, including filtering unwanted names.
 """
 
+# Import python library:
+import re
+import itertools
+import multiprocessing
+from collections.abc import Iterator
+
 # Import project files:
 from . import utils
 
 
+class CleanerPipeline:
+    """
+    A reusable cleaning pipeline, built once from the remove-words file and shared by
+    CleanSentences and CleanNames.
+
+    The punctuation regex is compiled once and the words to remove are kept in a set, so each
+    string is cleaned in a single pass over its tokens instead of rebuilding the remove-words
+    regex for every sentence and every name.
+
+    Attributes:
+        remove_words_set (set[str]): Words that are dropped from every cleaned string.
+        remove_words_regex (re.Pattern | None): The original alternation regex, used only when
+                                                a remove word can match across tokens.
+    """
+
+    punctuation_regex = re.compile(r'[^a-zA-Z0-9 ]')
+    token_regex = re.compile(r'[a-z0-9]+')
+
+    def __init__(self, remove_words_list: list[list[str]] | None = None):
+        remove_words_flat = utils.flatten_list(remove_words_list or [])
+        self.remove_words_set = set()
+        self.remove_words_regex = None
+
+        for word in remove_words_flat:
+            if self.token_regex.fullmatch(word):
+                self.remove_words_set.add(word)
+            elif word == '' or (' ' in word and re.fullmatch(r'[a-z0-9 ]+', word)):
+                # a word like this can match across tokens, so keep the exact regex behaviour
+                pattern = r'\b(' + '|'.join(re.escape(item) for item in remove_words_flat) + r')\b'
+                self.remove_words_regex = re.compile(pattern)
+                break
+            # any other word holds a character that is gone after cleaning, so it never matches
+
+    @classmethod
+    def from_csv(cls, filename_remove_names: str) -> 'CleanerPipeline':
+        """
+        Builds a pipeline from a remove-words CSV file.
+        """
+        return cls(utils.open_csv_format_for_sentences(filename_remove_names))
+
+    def clean_tokens(self, string: str | list[str]) -> list[str]:
+        """
+        Cleans a string and returns its remaining words.
+        """
+        string = self.punctuation_regex.sub(' ', str(string)).lower()
+        if self.remove_words_regex is not None:
+            return self.remove_words_regex.sub('', string).split()
+
+        return [word for word in string.split() if word not in self.remove_words_set]
+
+    def clean(self, string: str | list[str]) -> str:
+        """
+        Cleans a string the same way utils.clean_string does.
+        """
+        return ' '.join(self.clean_tokens(string))
+
+
+_worker_pipeline: CleanerPipeline | None = None
+
+
+def _init_worker(pipeline: CleanerPipeline) -> None:
+    """
+    Stores the pipeline in a pool worker, so it is sent once per worker and not once per chunk.
+    """
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+
+
+def _clean_chunk(rows: list[list[str]]) -> list[list[str]]:
+    """
+    Cleans a chunk of CSV rows inside a pool worker and drops the empty sentences.
+    """
+    cleaned_sentences = []
+    for row in rows:
+        clean_sen = _worker_pipeline.clean_tokens(row)
+        if clean_sen:
+            cleaned_sentences.append(clean_sen)
+    return cleaned_sentences
+
+
 class CleanSentences:
     """
        A class responsible for cleaning and preprocessing a list of sentences,
@@ -18,30 +105,67 @@ class CleanSentences:
        Attributes:
            filename_sentences (str): Path to the input CSV file containing sentences.
            filename_remove_names (str | None): Path to the file containing words to remove.
+           pipeline (CleanerPipeline | None): A shared pipeline; built from
+                                              filename_remove_names when not given.
        """
 
-    def __init__(self, filename_sentences: str, filename_remove_names: str | None = None):
+    def __init__(self, filename_sentences: str, filename_remove_names: str | None = None,
+                 pipeline: CleanerPipeline | None = None):
         self.filename_sentences = filename_sentences
         self.filename_remove_names = filename_remove_names
+        self.pipeline = pipeline
+
+    def get_pipeline(self) -> CleanerPipeline:
+        """
+        Returns the cleaning pipeline, building it on first use.
+        """
+        if self.pipeline is None:
+            self.pipeline = CleanerPipeline.from_csv(self.filename_remove_names)
+        return self.pipeline
 
 
-    def generate_clean_sentences_list(self) -> list[list[str]]:
+    def iter_clean_sentences(self) -> Iterator[list[str]]:
+        """
+        Reads the sentences file row by row and yields each cleaned, non-empty sentence
+        as a list of words. Only one row is held in memory at a time.
+
+        Yields:
+            list[str]: The words of the next cleaned sentence.
+        """
+        pipeline = self.get_pipeline()
+        for sentence in utils.iter_csv_format_for_sentences(self.filename_sentences):
+            clean_sen = pipeline.clean_tokens(sentence)
+            if clean_sen:
+                yield clean_sen
+
+    def __iter__(self) -> Iterator[list[str]]:
+        """
+        Iterating a CleanSentences object streams its cleaned sentences, so it can be passed
+        wherever a list of sentences is read from start to end (once or several times).
+        """
+        return self.iter_clean_sentences()
+
+    def generate_clean_sentences_list(self, workers: int = 1, chunk_size: int = 10000) -> list[list[str]]:
         """
         Generates a cleaned list of tokenized sentences, using a list of words to remove.
 
+        With more than one worker, the rows are split into chunks of chunk_size rows that are
+        cleaned in a process pool. The pipeline is sent once to each worker, and the chunks are
+        merged back in their original order, so the result is the same as the serial one.
+
         Returns:
             list[list[str]]: A list of sentences, each represented as a list of words.
         """
-        sentences = utils.open_csv_format_for_sentences(self.filename_sentences)
-        remove_names = utils.open_csv_format_for_sentences(self.filename_remove_names)
+        if workers <= 1:
+            return list(self.iter_clean_sentences())
 
-        cleaned_sentences = []
-        for sentence in sentences:
-            clean_sen = utils.clean_string(sentence, remove_names)
-            cleaned_sentences.append([clean_sen])
+        rows = utils.iter_csv_format_for_sentences(self.filename_sentences)
+        chunks = iter(lambda: list(itertools.islice(rows, chunk_size)), [])
 
-        cleaned_sentences = utils.remove_empty_sent(cleaned_sentences)
-        cleaned_sentences = utils.turn_list_to_single_str(cleaned_sentences)
+        cleaned_sentences = []
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self.get_pipeline(),)) as pool:
+            for cleaned_chunk in pool.imap(_clean_chunk, chunks):
+                cleaned_sentences.extend(cleaned_chunk)
 
         return cleaned_sentences
 
@@ -71,11 +195,23 @@ class CleanNames:
     Attributes:
         filename_names (str): Path to the CSV file with names.
         filename_remove_names (str): Path to the CSV file with names to be removed.
+        pipeline (CleanerPipeline | None): A shared pipeline; built from filename_remove_names
+                                           when not given.
     """
 
-    def __init__(self, filename_names: str, filename_remove_names: str):
+    def __init__(self, filename_names: str, filename_remove_names: str,
+                 pipeline: CleanerPipeline | None = None):
         self.filename_names = filename_names
         self.filename_remove_names = filename_remove_names
+        self.pipeline = pipeline
+
+    def get_pipeline(self) -> CleanerPipeline:
+        """
+        Returns the cleaning pipeline, building it on first use.
+        """
+        if self.pipeline is None:
+            self.pipeline = CleanerPipeline.from_csv(self.filename_remove_names)
+        return self.pipeline
 
 
     def generate_clean_names_list(self) -> list[list[list[str]]]:
@@ -87,18 +223,18 @@ class CleanNames:
                                    [cleaned_main_names, cleaned_other_names]
         """
         names_list = utils.open_csv_format_for_name(self.filename_names)
-        remove_names_list = utils.open_csv_format_for_sentences(self.filename_remove_names)
+        pipeline = self.get_pipeline()
         clean_list = []
         for sublist in names_list:
             cleaned_names = []
             cleaned_other_names = []
 
             for word in sublist[0]:
-                new_str = utils.clean_string(word, remove_names_list)
+                new_str = pipeline.clean(word)
                 cleaned_names.append(new_str)
 
             for word in sublist[1]:
-                new_str = utils.clean_string(word, remove_names_list)
+                new_str = pipeline.clean(word)
                 cleaned_other_names.append(new_str)
 
             clean_list.append([cleaned_names, cleaned_other_names])
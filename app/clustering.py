@@ -0,0 +1,496 @@
+"""
+This module implements the engines behind the sentence groups of task 9.
+
+Two sentences are connected when they share at least t distinct words, and the groups are the
+connected components. Instead of comparing every pair of sentences, the candidate pairs are
+found from the posting lists of their words, and the edges are fed straight into a union-find.
+
+Classes:
+    - UnionFind: Disjoint sets of sentence ids, merged edge by edge.
+    - SharedWordIndex: Finds the pairs of sentences that share at least t distinct words.
+    - MinHashLSH: Approximate groups for very large corpora, from MinHash signatures and LSH buckets.
+    - SingleLinkage: The groups of many thresholds, or the whole dendrogram, from one count of the pairs.
+
+Functions:
+    - parse_thresholds: Reads the --thresholds list of a threshold sweep.
+    - recall_report: Measures the pairs an approximate grouping misses, on a sample of sentences.
+    - sparse_shared_word_groups: The exact groups from blocked sparse matrix products (NumPy/SciPy).
+"""
+
+# Import python library:
+import random
+from array import array
+from bisect import bisect_right
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator, Sequence
+
+# Import project files:
+from . import index
+
+# The engines that group the Task 9 sentences; "minhash" is approximate, "sparse" needs NumPy and SciPy.
+ENGINES = ("python", "minhash", "sparse")
+
+# The LSH buckets of MinHashLSH: a pair becomes a candidate when all the rows of one band match.
+LSH_BANDS = 16
+LSH_ROWS = 2
+# A sentence of an LSH bucket is checked only against this many sentences before it in the bucket.
+LSH_BUCKET_WINDOW = 8
+# The sentences sampled by recall_report.
+RECALL_SAMPLE_SIZE = 200
+# The most shared-word counts (non-zero entries) one block of sparse_shared_word_groups may hold.
+SPARSE_BLOCK_NONZEROS = 1 << 24
+
+# A Mersenne prime for the (a * x + b) mod p hash functions of MinHash.
+_PRIME = (1 << 61) - 1
+
+
+def parse_thresholds(text: str) -> list[int]:
+    """
+    Parses a comma-separated list of thresholds, such as "1,2,4".
+    :raises ValueError: if it is empty or holds a value that is not a non-negative integer
+    """
+    thresholds = [int(value) for value in text.split(',')]
+    if any(threshold < 0 for threshold in thresholds):
+        raise ValueError(f'negative threshold in {text}')
+    return thresholds
+
+
+class UnionFind:
+    """
+    Disjoint sets over the ids 0..n-1, with union by size and path halving.
+
+    Attributes:
+        parents (list[int]): The parent of every id; a root is its own parent.
+        sizes (list[int]): The size of the set of every root.
+    """
+
+    def __init__(self, count: int):
+        self.parents = list(range(count))
+        self.sizes = [1] * count
+
+    @classmethod
+    def from_labels(cls, labels: Iterable[int]) -> 'UnionFind':
+        """
+        Builds the sets of a component labelling: the ids with the same label are in the same set.
+        """
+        roots: dict[int, int] = {}
+        components = cls(0)
+        for node, label in enumerate(labels):
+            root = roots.setdefault(label, node)
+            components.parents.append(root)
+            components.sizes.append(1)
+            if root != node:
+                components.sizes[root] += 1
+        return components
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def find(self, node: int) -> int:
+        """
+        Returns the root of the set of node.
+        """
+        parents = self.parents
+        while parents[node] != node:
+            parents[node] = parents[parents[node]]
+            node = parents[node]
+        return node
+
+    def union(self, first: int, second: int) -> bool:
+        """
+        Merges the sets of two ids.
+        :return: True if they were in different sets
+        """
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.sizes[first] < self.sizes[second]:
+            first, second = second, first
+        self.parents[second] = first
+        self.sizes[first] += self.sizes[second]
+        return True
+
+    def groups(self) -> list[list[int]]:
+        """
+        Returns the sets, each as its sorted ids, ordered by their smallest id.
+        """
+        groups: dict[int, list[int]] = {}
+        for node in range(len(self.parents)):
+            groups.setdefault(self.find(node), []).append(node)
+        return list(groups.values())
+
+
+class SharedWordIndex:
+    """
+    Finds the pairs of sentences that share at least t distinct words, from inverted indexes.
+
+    The words of every sentence are ordered from the rarest to the most frequent in the corpus.
+    If two sentences share t words, the rarest of those words has at least t - 1 shared words
+    after it in both sentences, so it is among the first len - t + 1 words (the prefix) of each.
+    Only the prefixes are indexed and probed, which leaves out, in every sentence, its t - 1 most
+    frequent words: the posting lists of the words found almost everywhere are never scanned for
+    the pairs that share nothing else. Every candidate pair is then checked with its exact count.
+
+    Attributes:
+        words_sets (list[frozenset[int]]): The distinct word ids of every sentence.
+        index (index.InvertedIndex): The sentences of every word id.
+    """
+
+    def __init__(self, sentences: Iterable[Sequence[int]]):
+        self.words_sets = [frozenset(sentence) for sentence in sentences]
+        self.index = index.InvertedIndex(self.words_sets)
+
+    def __len__(self) -> int:
+        return len(self.words_sets)
+
+    def prefixes(self, t: int) -> list[list[int]]:
+        """
+        Returns the first len - t + 1 words of every sentence, rarest first (none for a sentence of
+        fewer than t words, which cannot share t words).
+        """
+        postings = self.index.postings
+        rank = {word_id: (len(posting), word_id) for word_id, posting in postings.items()}
+        prefixes = []
+        for words in self.words_sets:
+            if len(words) < t:
+                prefixes.append([])
+            else:
+                prefixes.append(sorted(words, key=rank.__getitem__)[:len(words) - t + 1])
+        return prefixes
+
+    def candidates(self, t: int) -> Iterator[tuple[int, set[int]]]:
+        """
+        Yields every sentence i with the sentences j > i whose prefix shares a word with its prefix,
+        a superset of those that share at least t >= 1 words with it.
+        """
+        prefixes = self.prefixes(t)
+        prefix_postings = index.InvertedIndex(prefixes).postings
+        for i, prefix in enumerate(prefixes):
+            candidates = set()
+            for word_id in prefix:
+                posting = prefix_postings[word_id]
+                candidates.update(posting[bisect_right(posting, i):])
+            if candidates:
+                yield i, candidates
+
+    def pairs(self, t: int) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields every pair of sentences (i < j) that share at least t >= 1 distinct words.
+        :return: (i, j, the number of shared words)
+        """
+        words_sets = self.words_sets
+        for i, candidates in self.candidates(t):
+            words = words_sets[i]
+            for j in candidates:
+                shared = len(words & words_sets[j])
+                if shared >= t:
+                    yield i, j, shared
+
+    def cluster(self, t: int) -> UnionFind:
+        """
+        Connects every two sentences that share at least t distinct words.
+        :return: the union-find of the connected sentences
+        """
+        components = UnionFind(len(self.words_sets))
+        if t == 0:
+            # every two sentences share at least 0 words
+            for i in range(1, len(components)):
+                components.union(0, i)
+        elif t == 1:
+            # the sentences of one posting list share its word
+            for posting in self.index.postings.values():
+                for j in posting[1:]:
+                    components.union(posting[0], j)
+        else:
+            words_sets = self.words_sets
+            for i, candidates in self.candidates(t):
+                words = words_sets[i]
+                root = components.find(i)
+                for j in candidates:
+                    # a candidate already in the same group needs no count
+                    if components.find(j) != root and len(words & words_sets[j]) >= t:
+                        components.union(i, j)
+                        root = components.find(i)
+        return components
+
+
+class MinHashLSH:
+    """
+    Groups the sentences approximately, for corpora where even the candidate pairs of
+    SharedWordIndex are too many because common words are everywhere.
+
+    Every sentence gets a MinHash signature: for bands * rows random hash functions, the smallest
+    hash of its words. Two sentences agree on one of them with probability equal to their Jaccard
+    similarity. The signature is cut into bands, and the sentences that agree on all the rows of
+    a band fall into the same bucket. Only the pairs of a bucket are candidates, and each is still
+    checked with its exact number of shared words, so every edge is a real one; the pairs of low
+    similarity that never share a bucket are the ones that can be missed (see recall_report).
+
+    A bucket can hold a large part of the corpus (the sentences whose smallest hashes all come from
+    one common word), so a sentence is checked only against the last `window` sentences before it
+    in the bucket, and the cost stays linear in the size of the buckets. The members of a group of
+    similar sentences share many buckets, so they are still chained together.
+
+    For t <= 1 the exact groups are as cheap as the approximate ones, so they are returned.
+
+    Attributes:
+        bands (int): The number of bands of a signature.
+        rows (int): The number of hash values in a band.
+        window (int): The sentences of a bucket a sentence is checked against.
+    """
+
+    def __init__(self, bands: int = LSH_BANDS, rows: int = LSH_ROWS, seed: int = 0,
+                 window: int = LSH_BUCKET_WINDOW):
+        self.bands = bands
+        self.rows = rows
+        self.window = window
+        generator = random.Random(seed)
+        self._coefficients = [(generator.randrange(1, _PRIME), generator.randrange(_PRIME))
+                              for _ in range(bands * rows)]
+        self._word_hashes: dict[int, array] = {}
+
+    def _hashes(self, word_id: int) -> array:
+        """
+        Returns the hash values of a word, computed once per word.
+        """
+        hashes = self._word_hashes.get(word_id)
+        if hashes is None:
+            hashes = self._word_hashes[word_id] = array('Q', [(a * word_id + b) % _PRIME
+                                                               for a, b in self._coefficients])
+        return hashes
+
+    def signature(self, words: Iterable[int]) -> tuple[int, ...]:
+        """
+        Returns the MinHash signature of a non-empty set of words.
+        """
+        return tuple(map(min, zip(*[self._hashes(word_id) for word_id in words])))
+
+    def buckets(self, words_sets: Sequence[frozenset[int]], t: int) -> Iterator[list[int]]:
+        """
+        Yields the sentences of every bucket that holds more than one, among the sentences of at
+        least t words.
+        """
+        rows = self.rows
+        buckets: dict[tuple, list[int]] = {}
+        for sentence_id, words in enumerate(words_sets):
+            if not words or len(words) < t:
+                continue
+            signature = self.signature(words)
+            for band in range(self.bands):
+                key = (band,) + signature[band * rows:(band + 1) * rows]
+                buckets.setdefault(key, []).append(sentence_id)
+
+        for bucket in buckets.values():
+            if len(bucket) > 1:
+                yield bucket
+
+    def cluster(self, shared_words: SharedWordIndex, t: int) -> UnionFind:
+        """
+        Connects the candidate pairs of the LSH buckets that share at least t distinct words; every
+        sentence of a bucket is checked against the window of sentences before it.
+        :return: the union-find of the connected sentences
+        """
+        if t <= 1:
+            return shared_words.cluster(t)
+
+        words_sets = shared_words.words_sets
+        components = UnionFind(len(words_sets))
+        for bucket in self.buckets(words_sets, t):
+            previous: deque[int] = deque(maxlen=self.window)
+            for j in bucket:
+                words = words_sets[j]
+                for i in previous:
+                    if components.find(i) != components.find(j) and len(words & words_sets[i]) >= t:
+                        components.union(i, j)
+                previous.append(j)
+        return components
+
+
+class SingleLinkage:
+    """
+    Groups the sentences for many thresholds at once. The shared words of every pair that shares
+    at least min_t of them are counted once, and the pairs are merged into a union-find in
+    descending order of their count: the groups after merging the pairs of count >= t are
+    exactly the groups of the threshold t, so every threshold is a snapshot of one pass. Recording
+    the merges themselves gives the single-linkage dendrogram.
+
+    Attributes:
+        sentences_count (int): The number of sentences.
+        levels (dict[int, array]): For every count, the pairs (i, j, i, j, ...) that share it.
+    """
+
+    def __init__(self, shared_words: SharedWordIndex, min_t: int = 1):
+        self.sentences_count = len(shared_words)
+        self.levels: dict[int, array] = {}
+        for i, j, shared in shared_words.pairs(max(min_t, 1)):
+            level = self.levels.get(shared)
+            if level is None:
+                level = self.levels[shared] = array('I')
+            level.append(i)
+            level.append(j)
+
+    def _merges(self, components: UnionFind) -> Iterator[tuple[int, int, int]]:
+        """
+        Yields the pairs of different groups in descending order of their count, and then every
+        remaining group with the first one at count 0, which every two sentences share. The caller
+        merges every yielded pair into components before the next one.
+        :return: (count, root of the first group, root of the second group)
+        """
+        for shared in sorted(self.levels, reverse=True):
+            level = self.levels[shared]
+            for position in range(0, len(level), 2):
+                first, second = components.find(level[position]), components.find(level[position + 1])
+                if first != second:
+                    yield shared, first, second
+
+        groups = components.groups()
+        for group in groups[1:]:
+            yield 0, components.find(groups[0][0]), components.find(group[0])
+
+    def groups_at(self, thresholds: Iterable[int]) -> dict[int, list[list[int]]]:
+        """
+        Returns the groups of sentence ids of every threshold (each at least min_t, or 0).
+        """
+        pending = sorted(set(thresholds), reverse=True)
+        groups_by_threshold = {}
+        components = UnionFind(self.sentences_count)
+        for shared, first, second in self._merges(components):
+            while pending and shared < pending[0]:
+                groups_by_threshold[pending.pop(0)] = components.groups()
+            if not pending:
+                break
+            components.union(first, second)
+        for threshold in pending:
+            # the remaining thresholds are reached only when every group is merged
+            groups_by_threshold[threshold] = UnionFind.from_labels([0] * self.sentences_count).groups()
+        return groups_by_threshold
+
+    def dendrogram(self) -> list[list[int]]:
+        """
+        Returns the single-linkage merges, in the order of decreasing shared words: the sentence i
+        is the cluster i, and merge m joins two clusters into the cluster sentences_count + m.
+        :return: [shared words, first cluster, second cluster, sentences in the new cluster] per merge
+        """
+        components = UnionFind(self.sentences_count)
+        clusters = list(range(self.sentences_count))
+        merges = []
+        for shared, first, second in self._merges(components):
+            first_cluster, second_cluster = sorted((clusters[first], clusters[second]))
+            components.union(first, second)
+            root = components.find(first)
+            clusters[root] = self.sentences_count + len(merges)
+            merges.append([shared, first_cluster, second_cluster, components.sizes[root]])
+        return merges
+
+
+def recall_report(shared_words: SharedWordIndex, components: UnionFind, t: int,
+                  sample_size: int = RECALL_SAMPLE_SIZE, seed: int = 0) -> dict[str, int | float]:
+    """
+    Compares an approximate grouping with the exact engine on a random sample of sentences: every
+    pair of a sampled sentence and another sentence that share at least t words is found from the
+    inverted index, and the pairs left in two different groups are missed.
+    :return: the sample size, the exact pairs, the pairs in the same group and their ratio (the recall)
+    """
+    words_sets = shared_words.words_sets
+    postings = shared_words.index.postings
+    sample = random.Random(seed).sample(range(len(words_sets)), min(sample_size, len(words_sets)))
+
+    exact_pairs = grouped_pairs = 0
+    for i in sample:
+        if t == 0:
+            neighbours = [j for j in range(len(words_sets)) if j != i]
+        else:
+            counts = Counter()
+            for word_id in words_sets[i]:
+                counts.update(postings[word_id])
+            neighbours = [j for j, shared in counts.items() if shared >= t and j != i]
+        root = components.find(i)
+        exact_pairs += len(neighbours)
+        grouped_pairs += sum(1 for j in neighbours if components.find(j) == root)
+
+    return {
+        "Sampled Sentences": len(sample),
+        "Exact Pairs": exact_pairs,
+        "Grouped Pairs": grouped_pairs,
+        "Recall": grouped_pairs / exact_pairs if exact_pairs else 1.0,
+    }
+
+
+def sparse_shared_word_groups(sentences: Iterable[Sequence[int]], t: int,
+                              block_nonzeros: int = SPARSE_BLOCK_NONZEROS) -> UnionFind:
+    """
+    Finds the exact groups with sparse matrices, for mid-size corpora:
+        - X (sentences x words) has a 1 where a sentence holds a word, so X @ X.T holds the number
+          of distinct words shared by every pair of sentences;
+        - up to t - 1 (at most 8) of the most frequent words are kept out of X, as a bitmask per
+          sentence: a pair that shares t words still shares one of the other words, so it is an
+          entry of the product, and the popcount of the two bitmasks adds its frequent words back;
+        - X @ X.T is computed in blocks of rows, each with at most about block_nonzeros entries
+          (the sentences of the words of the block), thresholded at t and discarded;
+        - after every block, the components are labelled again over its edges and the previous labels.
+    For t = 1 the components of the sentence-word graph are labelled directly, without a product.
+    NumPy and SciPy are imported only when this engine is used.
+    :return: the union-find of the connected sentences
+    """
+    import numpy as np
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+
+    indptr = array('q', [0])
+    indices = array('q')
+    for sentence in sentences:
+        indices.extend(set(sentence))
+        indptr.append(len(indices))
+    sentences_count = len(indptr) - 1
+    words_count = max(indices) + 1 if indices else 0
+
+    if t == 0:
+        return UnionFind.from_labels([0] * sentences_count)
+    if not indices:
+        return UnionFind(sentences_count)
+
+    words = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), np.frombuffer(indices, dtype=np.int64),
+                               np.frombuffer(indptr, dtype=np.int64)), shape=(sentences_count, words_count))
+    if t == 1:
+        bipartite = sparse.bmat([[None, words], [words.T, None]], format='csr')
+        return UnionFind.from_labels(connected_components(bipartite, directed=False)[1][:sentences_count].tolist())
+
+    words_t = words.T.tocsr()
+    postings_lengths = np.diff(words_t.indptr)
+    frequent = np.argsort(-postings_lengths, kind='stable')[:min(t - 1, 8, words_count)]
+    masks = np.zeros(sentences_count, dtype=np.uint8)
+    for bit, word_id in enumerate(frequent):
+        masks[words_t.indices[words_t.indptr[word_id]:words_t.indptr[word_id + 1]]] |= np.uint8(1 << bit)
+    kept = np.ones(words_count, dtype=bool)
+    kept[frequent] = False
+    words = words[:, kept]
+    words_t = words.T.tocsr()
+    bits = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int32)
+
+    # the entries of a row of X @ X.T are at most the sentences of its words
+    row_costs = words @ postings_lengths[kept].astype(np.int64)
+    labels = np.arange(sentences_count)
+    start = 0
+    while start < sentences_count:
+        cumulative = np.cumsum(row_costs[start:])
+        end = start + max(1, int(np.searchsorted(cumulative, block_nonzeros, side='right')))
+        # only the pairs (i, j > i): the columns from the first row of the block on
+        shared = (words[start:end] @ words_t[:, start:]).tocoo()
+        keep = (shared.col > shared.row) & (shared.data + len(frequent) >= t)
+        rows, columns, counts = shared.row[keep] + start, shared.col[keep] + start, shared.data[keep]
+        if len(frequent):
+            counts = counts + bits[masks[rows] & masks[columns]]
+        keep = counts >= t
+        rows, columns = rows[keep], columns[keep]
+        if len(rows):
+            # the previous components join every sentence to the first sentence of its label
+            _, first = np.unique(labels, return_index=True)
+            edges = sparse.coo_matrix(
+                (np.ones(len(rows) + sentences_count, dtype=np.int8),
+                 (np.concatenate([rows, np.arange(sentences_count)]),
+                  np.concatenate([columns, first[labels]]))),
+                shape=(sentences_count, sentences_count))
+            labels = connected_components(edges, directed=False)[1]
+        start = end
+
+    return UnionFind.from_labels(labels.tolist())
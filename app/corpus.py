@@ -0,0 +1,454 @@
+"""
+This module defines the shared vocabulary layer used to store cleaned sentences compactly.
+
+Every cleaned word is mapped to an integer id once, and sentences are kept as array('I')
+buffers of ids. Sequences of words can then be hashed as tuples of ints instead of freshly
+joined strings.
+
+It also defines the binary preprocessed corpus format written by Task 1. The file holds the
+vocabulary, the names table, and the word ids of all sentences. It is memory-mapped when read,
+so loading it does not depend on the corpus size and several processes share the same pages.
+The vocabulary is searched in place too: the file stores where every word starts and the word
+ids in sorted word order, so a word is found by binary search and decoded only when it is used.
+
+Classes:
+    - Vocabulary: Maps each cleaned word to an integer id and back.
+    - MappedVocabulary: The vocabulary of a corpus file, searched in the mapped pages.
+    - EncodedCorpus: Holds a list of sentences as arrays of word ids over a shared Vocabulary.
+    - MappedCorpus: A read-only view of a binary preprocessed corpus file.
+"""
+
+# Import python library:
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+
+CORPUS_EXTENSION = ".corpus"
+CORPUS_MAGIC = b'TACORPUS'
+CORPUS_VERSION = 1
+
+# magic, version, number of sections
+_HEADER = struct.Struct('<8sII')
+# section name, offset, length in bytes
+_SECTION = struct.Struct('<8sQQ')
+
+
+class Vocabulary:
+    """
+    A two-way mapping between cleaned words and integer ids.
+
+    Ids are given in the order words are first seen, starting at 0. Cleaned words never contain
+    spaces, so a tuple of ids stands for exactly one space-joined k-seq.
+
+    Attributes:
+        token_ids (dict[str, int]): The id of every known word.
+        tokens (list[str]): The word of every id.
+    """
+
+    def __init__(self, tokens: Iterable[str] | None = None):
+        self.token_ids: dict[str, int] = {}
+        self.tokens: list[str] = []
+        for token in tokens or []:
+            self.add(token)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def add(self, token: str) -> int:
+        """
+        Returns the id of a word, giving it a new id if it was not seen before.
+        """
+        token_id = self.token_ids.get(token)
+        if token_id is None:
+            token_id = len(self.tokens)
+            self.token_ids[token] = token_id
+            self.tokens.append(token)
+        return token_id
+
+    def encode(self, words: Iterable[str]) -> array:
+        """
+        Encodes a sentence into an array of word ids, adding unknown words.
+        """
+        return array('I', [self.add(word) for word in words])
+
+    def lookup(self, words: Iterable[str]) -> tuple[int, ...] | None:
+        """
+        Encodes a sequence of words without adding new ones.
+        :return: a tuple of ids, or None if one of the words is unknown (so it appears nowhere).
+        """
+        ids = []
+        for word in words:
+            token_id = self.token_ids.get(word)
+            if token_id is None:
+                return None
+            ids.append(token_id)
+        return tuple(ids)
+
+    def decode(self, ids: Iterable[int]) -> list[str]:
+        """
+        Turns a sequence of word ids back into the list of words.
+        """
+        tokens = self.tokens
+        return [tokens[token_id] for token_id in ids]
+
+    def join(self, ids: Iterable[int]) -> str:
+        """
+        Turns a sequence of word ids back into a space-joined k-seq string.
+        """
+        return ' '.join(self.decode(ids))
+
+
+class _MappedTokens(Sequence):
+    """
+    The word of every id of a MappedVocabulary, decoded from the mapped bytes on first access.
+    """
+
+    def __init__(self, vocabulary: 'MappedVocabulary'):
+        self._vocabulary = vocabulary
+        self._decoded: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self._vocabulary.stored_count + len(self._vocabulary.added_tokens)
+
+    def __getitem__(self, token_id: int) -> str:
+        token = self._decoded.get(token_id)
+        if token is None:
+            vocabulary = self._vocabulary
+            if 0 <= token_id < vocabulary.stored_count:
+                token = self._decoded[token_id] = vocabulary.stored_bytes(token_id).decode('utf-8')
+            elif vocabulary.stored_count <= token_id < len(self):
+                token = vocabulary.added_tokens[token_id - vocabulary.stored_count]
+            else:
+                raise IndexError('token id out of range')
+        return token
+
+
+class _MappedTokenIds(Mapping):
+    """
+    The id of every word of a MappedVocabulary, found by binary search over the sorted ids.
+    """
+
+    def __init__(self, vocabulary: 'MappedVocabulary'):
+        self._vocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self._vocabulary.tokens)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._vocabulary.tokens)
+
+    def __getitem__(self, token: str) -> int:
+        vocabulary = self._vocabulary
+        key = token.encode('utf-8')
+        sorted_ids = vocabulary.sorted_ids
+        position = bisect_left(sorted_ids, key, key=vocabulary.stored_bytes)
+        if position < len(sorted_ids) and vocabulary.stored_bytes(sorted_ids[position]) == key:
+            return sorted_ids[position]
+        return vocabulary.added_ids[token]
+
+
+class MappedVocabulary(Vocabulary):
+    """
+    The vocabulary of a corpus file, used in place. The words are stored one after the other,
+    with the offset where every word starts and the ids sorted by word (as UTF-8 bytes): the word
+    of an id is sliced from the mapped bytes and decoded on first use, and the id of a word is
+    found by binary search. Nothing is read when the file is opened, so the pages are shared by
+    all the processes that map it. Words added later, such as names missing from the corpus, get
+    the next ids in memory.
+
+    Attributes:
+        words (memoryview): The UTF-8 words, each followed by a newline.
+        word_offsets (Sequence[int]): Start of every word in words, plus the end of the last one.
+        sorted_ids (Sequence[int]): The ids of the stored words, in sorted word order.
+        stored_count (int): The number of stored words.
+        added_tokens (list[str]): The words added after the stored ones.
+        added_ids (dict[str, int]): The id of every added word.
+    """
+
+    def __init__(self, words: memoryview, word_offsets: Sequence[int], sorted_ids: Sequence[int]):
+        self.words = words
+        self.word_offsets = word_offsets
+        self.sorted_ids = sorted_ids
+        self.stored_count = len(word_offsets) - 1
+        self.added_tokens: list[str] = []
+        self.added_ids: dict[str, int] = {}
+        self.tokens = _MappedTokens(self)
+        self.token_ids = _MappedTokenIds(self)
+
+    def stored_bytes(self, token_id: int) -> bytes:
+        """
+        Returns the UTF-8 bytes of a stored word, without its newline.
+        """
+        return bytes(self.words[self.word_offsets[token_id]:self.word_offsets[token_id + 1] - 1])
+
+    def add(self, token: str) -> int:
+        token_id = self.token_ids.get(token)
+        if token_id is None:
+            token_id = len(self.tokens)
+            self.added_ids[token] = token_id
+            self.added_tokens.append(token)
+        return token_id
+
+
+class EncodedCorpus:
+    """
+    A list of sentences stored as array('I') buffers of word ids.
+
+    Attributes:
+        vocabulary (Vocabulary): The vocabulary shared by all sentences.
+        sentences (list[array]): The encoded sentences, in their original order.
+    """
+
+    def __init__(self, sentences: Iterable[list[str]] = (), vocabulary: Vocabulary | None = None):
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self.sentences: list[array] = [self.vocabulary.encode(sentence) for sentence in sentences]
+
+    @classmethod
+    def from_ids(cls, sentences_ids: Sequence[Sequence[int]], vocabulary: Vocabulary) -> 'EncodedCorpus':
+        """
+        Builds a corpus from sentences that are already encoded, without copying them.
+        """
+        encoded_corpus = cls(vocabulary=vocabulary)
+        encoded_corpus.sentences = sentences_ids
+        return encoded_corpus
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def __iter__(self) -> Iterator[array]:
+        return iter(self.sentences)
+
+    def __getitem__(self, index: int) -> array:
+        return self.sentences[index]
+
+    def decode(self, index: int) -> list[str]:
+        """
+        Returns the words of a sentence.
+        """
+        return self.vocabulary.decode(self.sentences[index])
+
+
+class MappedCorpus(Sequence):
+    """
+    A read-only, memory-mapped view of a binary preprocessed corpus file.
+
+    It behaves like the list of processed sentences in the Task 1 JSON: indexing or iterating it
+    returns lists of words, decoded on access. The word ids themselves are read straight from the
+    mapped pages, without parsing or copying.
+
+    Attributes:
+        names (list): The processed names table.
+        offsets (memoryview): Start of every sentence in tokens, plus the end of the last one.
+        tokens (memoryview): The word ids of all sentences, one after the other.
+    """
+
+    def __init__(self, file_path: str):
+        self._sections = read_sections(file_path, CORPUS_MAGIC)
+        self.names = json.loads(bytes(self._sections['names']).decode('utf-8'))
+        self.offsets = array_view(self._sections['offsets'], 'Q')
+        self.tokens = array_view(self._sections['tokens'], 'I')
+        if len(self.offsets) == 0 or self.offsets[-1] > len(self.tokens):
+            raise ValueError(f'{file_path} has sentences past the end of its tokens')
+        self._vocabulary = None
+        words = self._sections['vocab']
+        if 'wordoffs' in self._sections:
+            word_offsets = array_view(self._sections['wordoffs'], 'Q')
+            sorted_ids = array_view(self._sections['wordsort'], 'I')
+            if len(word_offsets) != len(sorted_ids) + 1 or word_offsets[-1] > len(words):
+                raise ValueError(f'{file_path} has an inconsistent word table')
+            self._vocabulary = MappedVocabulary(words, word_offsets, sorted_ids)
+
+    @property
+    def vocabulary(self) -> Vocabulary:
+        """
+        The vocabulary of the corpus, searched in the mapped word table. Files written without a
+        word table have their vocabulary read whole, on first use.
+        """
+        if self._vocabulary is None:
+            words = bytes(self._sections['vocab']).decode('utf-8')
+            self._vocabulary = Vocabulary(words.split('\n') if words else [])
+        return self._vocabulary
+
+    def section(self, name: str) -> memoryview | None:
+        """
+        Returns the raw bytes of a section, or None if the file has no such section.
+        """
+        return self._sections.get(name)
+
+    def array_section(self, name: str, type_code: str) -> memoryview | None:
+        """
+        Returns a section viewed as an array of the given type, or None if the file has no such section.
+        """
+        buffer = self._sections.get(name)
+        if buffer is None:
+            return None
+        return array_view(buffer, type_code)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def sentence_ids(self, index: int) -> memoryview:
+        """
+        Returns the word ids of a sentence, without copying them.
+        """
+        return self.tokens[self.offsets[index]:self.offsets[index + 1]]
+
+    def __getitem__(self, index: int) -> list[str]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('sentence index out of range')
+        return self.vocabulary.decode(self.sentence_ids(index))
+
+    def decode(self, index: int) -> list[str]:
+        """
+        Returns the words of a sentence.
+        """
+        return self[index]
+
+    def to_encoded(self) -> EncodedCorpus:
+        """
+        Returns the sentences as an EncodedCorpus that reads the mapped word ids.
+        """
+        return EncodedCorpus.from_ids([self.sentence_ids(i) for i in range(len(self))], self.vocabulary)
+
+
+def encode_sentences(sentences: Iterable[list[str]]) -> EncodedCorpus:
+    """
+    Encodes a list of sentences, reusing the stored word ids when it is a mapped corpus file.
+    """
+    if isinstance(sentences, MappedCorpus):
+        return sentences.to_encoded()
+    return EncodedCorpus(sentences)
+
+
+def vocabulary_for(sentences: Iterable[list[str]]) -> Vocabulary:
+    """
+    Returns the vocabulary to encode sentences with: the stored one of a mapped corpus file,
+    or a new one.
+    """
+    if isinstance(sentences, MappedCorpus):
+        return sentences.vocabulary
+    return Vocabulary()
+
+
+def iter_encoded_sentences(sentences: Iterable[list[str]], vocabulary: Vocabulary)\
+        -> Iterator[Sequence[int]]:
+    """
+    Yields the word ids of every sentence. A mapped corpus file yields its stored ids, which
+    match the ids of its own vocabulary.
+    """
+    if isinstance(sentences, MappedCorpus):
+        for i in range(len(sentences)):
+            yield sentences.sentence_ids(i)
+        return
+
+    for sentence in sentences:
+        yield vocabulary.encode(sentence)
+
+
+def array_view(buffer: memoryview, type_code: str) -> memoryview:
+    """
+    Views a little-endian section as an array of the given type.
+    :raises ValueError: if the section is not made of whole items
+    """
+    if len(buffer) % array(type_code).itemsize:
+        raise ValueError(f'a section of {len(buffer)} bytes is not an array of {type_code!r} items')
+    if sys.byteorder != 'little':
+        values = array(type_code, bytes(buffer))
+        values.byteswap()
+        return memoryview(values)
+    return buffer.cast(type_code)
+
+
+def little_endian(values: array) -> bytes:
+    """
+    Returns the bytes of an array in little-endian order.
+    """
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_corpus(file_path: str, sentences: Iterable[list[str]], names: list,
+                 vocabulary: Vocabulary | None = None, extra_sections: Iterable[tuple[str, bytes]] = ()) -> None:
+    """
+    Writes processed sentences and names into a binary preprocessed corpus file.
+    :param file_path: path of the file to write
+    :param sentences: the processed sentences, each a list of words
+    :param names: the processed names table
+    :param vocabulary: the word ids to use, when other sections refer to them
+    :param extra_sections: more (name, bytes) sections to store after the corpus ones
+    """
+    vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+    offsets = array('Q', [0])
+    tokens = array('I')
+    for sentence in sentences:
+        tokens.extend(vocabulary.encode(sentence))
+        offsets.append(len(tokens))
+
+    words = [token.encode('utf-8') for token in vocabulary.tokens]
+    word_offsets = array('Q', [0])
+    for word in words:
+        word_offsets.append(word_offsets[-1] + len(word) + 1)
+    sorted_ids = array('I', sorted(range(len(words)), key=words.__getitem__))
+
+    sections = [
+        ('vocab', b''.join(word + b'\n' for word in words)),
+        ('wordoffs', little_endian(word_offsets)),
+        ('wordsort', little_endian(sorted_ids)),
+        ('names', json.dumps(names).encode('utf-8')),
+        ('offsets', little_endian(offsets)),
+        ('tokens', little_endian(tokens)),
+    ]
+    sections.extend(extra_sections)
+    write_sections(file_path, sections)
+
+
+def read_sections(file_path: str, magic: bytes) -> dict[str, memoryview]:
+    """
+    Memory-maps a file of sections and returns the bytes of every section, without copying them.
+    :raises ValueError: if the file does not start with the given magic and the current version,
+                        or a section reaches past the end of the file
+    """
+    with open(file_path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < _HEADER.size:
+        raise ValueError(f'{file_path} is too short')
+    file_magic, version, sections_count = _HEADER.unpack_from(mapped, 0)
+    if file_magic != magic or version != CORPUS_VERSION:
+        raise ValueError(f'{file_path} is not a {magic.decode("ascii")} file')
+
+    sections = {}
+    for i in range(sections_count):
+        name, offset, length = _SECTION.unpack_from(mapped, _HEADER.size + i * _SECTION.size)
+        if offset + length > len(mapped):
+            raise ValueError(f'{file_path} is truncated')
+        sections[name.rstrip(b'\0').decode('ascii')] = memoryview(mapped)[offset:offset + length]
+    return sections
+
+
+def write_sections(file_path: str, sections: list[tuple[str, bytes]], magic: bytes = CORPUS_MAGIC) -> None:
+    """
+    Writes the header, the section table and the sections, each aligned to 8 bytes.
+    Corpus (and index) files and graph files share this layout and differ by their magic.
+    """
+    offset = _HEADER.size + len(sections) * _SECTION.size
+    table = []
+    for name, data in sections:
+        offset += -offset % 8
+        table.append(_SECTION.pack(name.encode('ascii'), offset, len(data)))
+        offset += len(data)
+
+    with open(file_path, 'wb') as file:
+        file.write(_HEADER.pack(magic, CORPUS_VERSION, len(sections)))
+        file.write(b''.join(table))
+        for name, data in sections:
+            file.write(b'\0' * (-file.tell() % 8))
+            file.write(data)
@@ -0,0 +1,657 @@
+"""
+This module implements the engines behind the people graph of tasks 6-8.
+
+Classes:
+    - CSRGraph: The people graph as integer arrays (compressed sparse rows), stored in .graph files.
+    - SlidingWindowCooccurrence: Counts, for every pair of persons, the windows of k consecutive
+                                 sentences that mention both, in one pass over the sentences.
+    - ReachabilityIndex: Answers "are two persons connected by at most d edges" over a graph
+                         that is built once.
+    - SimplePathFinder: Answers "are two persons the ends of a simple path of exactly L persons".
+
+Functions:
+    - sparse_window_cooccurrence: The same counts from sparse matrix products (NumPy/SciPy).
+"""
+
+# Import python library:
+import math
+import random
+from array import array
+from collections import deque
+from collections.abc import Hashable, Iterable, Iterator, Mapping, Sequence
+
+# Import project files:
+from . import corpus
+
+# The people graph file written by Task 6 --save_graph and read by Tasks 7 and 8.
+GRAPH_EXTENSION = ".graph"
+GRAPH_MAGIC = b'TA_GRAPH'
+
+# The engines that count the Task 6 pair windows; "sparse" needs NumPy and SciPy.
+ENGINES = ("python", "sparse")
+
+# The landmark oracle of ReachabilityIndex is built by default for graphs of at least this many persons.
+LANDMARKS_MIN_PERSONS = 1000
+LANDMARKS_COUNT = 16
+
+# SimplePathFinder decides the paths of at most this many persons by colour-coding, which misses
+# a path with at most this probability, and runs this many colourings together as the bits of ints.
+COLOUR_CODING_MAX_PERSONS = 8
+COLOUR_CODING_ERROR = 1e-6
+COLOUR_CODING_BATCH = 1024
+
+
+class CSRGraph(Mapping):
+    """
+    The people graph in compressed sparse row form. The persons are numbered 0..n-1 in the order
+    of their names, the neighbours of person i are neighbors[offsets[i]:offsets[i + 1]], and
+    weights, when known, holds the number of windows shared by every edge at the same position.
+
+    It is a Mapping from person ids to arrays of neighbour ids, so ReachabilityIndex and
+    SimplePathFinder traverse it as it is; node() turns a name into its id once per query.
+
+    Task 6 writes it into a .graph file, in the layout of the .corpus files. Reading the file back
+    only parses the names table: the arrays are viewed straight from the memory-mapped pages.
+
+    Attributes:
+        names (list[str]): The name of every person id.
+        node_ids (dict[str, int]): The id of every name.
+        offsets (Sequence[int]): Start of every person's neighbours, plus the end of the last ones.
+        neighbors (Sequence[int]): The neighbour ids of all persons, one after the other.
+        weights (Sequence[int] | None): The shared windows of every edge, or None if unknown.
+    """
+
+    def __init__(self, names: list[str], offsets: Sequence[int], neighbors: Sequence[int],
+                 weights: Sequence[int] | None = None):
+        if len(offsets) != len(names) + 1 or offsets[-1] != len(neighbors):
+            raise ValueError('the offsets do not match the names and the neighbours')
+        if weights is not None and len(weights) != len(neighbors):
+            raise ValueError('the weights do not match the neighbours')
+        self.names = names
+        self.node_ids = {name: node for node, name in enumerate(names)}
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.weights = weights
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Mapping[str, Mapping[str, int | None] | Iterable[str]]) -> 'CSRGraph':
+        """
+        Builds the graph from the neighbours of every name, given as a collection of names or as a
+        mapping from every neighbour to the weight of the edge. Every name that appears is a person.
+        """
+        names = set(adjacency)
+        for neighbours in adjacency.values():
+            names.update(neighbours)
+        names = sorted(names)
+        node_ids = {name: node for node, name in enumerate(names)}
+
+        offsets = array('Q', [0])
+        neighbors = array('I')
+        weights = array('I')
+        weighted = True
+        for name in names:
+            neighbours = adjacency.get(name, ())
+            if not isinstance(neighbours, Mapping):
+                neighbours = dict.fromkeys(neighbours)
+            for neighbour in sorted(neighbours, key=node_ids.__getitem__):
+                neighbors.append(node_ids[neighbour])
+                weight = neighbours[neighbour]
+                if weight is None:
+                    weighted = False
+                elif weighted:
+                    weights.append(weight)
+            offsets.append(len(neighbors))
+
+        return cls(names, memoryview(offsets), memoryview(neighbors), memoryview(weights) if weighted else None)
+
+    @classmethod
+    def from_counts(cls, count_mentions: Mapping[tuple[str, str], int], t: int) -> 'CSRGraph':
+        """
+        Builds the people graph of Task 6: an edge, weighted by its count, for every pair of names
+        that share at least t windows.
+        """
+        adjacency: dict[str, dict[str, int]] = {}
+        for (name1, name2), count in count_mentions.items():
+            if count >= t:
+                adjacency.setdefault(name1, {})[name2] = count
+                adjacency.setdefault(name2, {})[name1] = count
+        return cls.from_adjacency(adjacency)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'CSRGraph':
+        """
+        Memory-maps a graph file written by write().
+        :raises ValueError, KeyError: if it is not a valid graph file
+        """
+        sections = corpus.read_sections(file_path, GRAPH_MAGIC)
+        names = bytes(sections['names']).decode('utf-8')
+        names = names.split('\n') if names else []
+        offsets = corpus.array_view(sections['offsets'], 'Q')
+        neighbors = corpus.array_view(sections['neighbor'], 'I')
+        weights = sections.get('weights')
+        weights = corpus.array_view(weights, 'I') if weights is not None else None
+        if (len(offsets) != len(names) + 1 or offsets[-1] > len(neighbors)
+                or (weights is not None and len(weights) != len(neighbors))):
+            raise ValueError(f'{file_path} has an inconsistent graph')
+        return cls(names, offsets, neighbors, weights)
+
+    def write(self, file_path: str) -> None:
+        """
+        Writes the graph into a graph file.
+        """
+        sections = [
+            ('names', '\n'.join(self.names).encode('utf-8')),
+            ('offsets', corpus.little_endian(array('Q', self.offsets))),
+            ('neighbor', corpus.little_endian(array('I', self.neighbors))),
+        ]
+        if self.weights is not None:
+            sections.append(('weights', corpus.little_endian(array('I', self.weights))))
+        corpus.write_sections(file_path, sections, GRAPH_MAGIC)
+
+    def node(self, name: str) -> int | None:
+        """
+        Returns the id of a name, or None if it is not a person of the graph.
+        """
+        return self.node_ids.get(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.names)))
+
+    def __contains__(self, node: object) -> bool:
+        return isinstance(node, int) and 0 <= node < len(self.names)
+
+    def __getitem__(self, node: int) -> Sequence[int]:
+        if node not in self:
+            raise KeyError(node)
+        return self.neighbors[self.offsets[node]:self.offsets[node + 1]]
+
+    def get(self, node: int, default=None):
+        if node not in self:
+            return default
+        return self.neighbors[self.offsets[node]:self.offsets[node + 1]]
+
+
+class SlidingWindowCooccurrence:
+    """
+    Counts the windows of k consecutive sentences in which each pair of persons is mentioned.
+
+    The persons of every sentence are given once, in order. As the window slides, a count of
+    mentions in the window is kept for every person, so a person's presence is a run of
+    consecutive windows: it starts when its count leaves 0 and ends when it drops back to 0.
+    Two persons share exactly the windows where their runs overlap, so when a run ends it is
+    matched only against the runs still open at that time. The work done is proportional to the
+    pairs of persons that really meet in a window, never to all the pairs of the names table.
+
+    Attributes:
+        k (int): The window size.
+        sentences_count (int): How many sentences were added.
+        pair_counts (dict[tuple[int, int], int]): For every pair of persons (i < j) that meet,
+                                                  the number of windows they share.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.sentences_count = 0
+        self.pair_counts: dict[tuple[int, int], int] = {}
+        self._window: deque[set[int]] = deque()
+        self._mentions: dict[int, int] = {}
+        self._open_runs: dict[int, int] = {}
+        self._windows_count = 0
+
+    def _end_run(self, person: int, last_window: int) -> None:
+        """
+        Ends the run of a person at last_window and counts its overlap with every open run.
+        """
+        first_window = self._open_runs.pop(person)
+        pair_counts = self.pair_counts
+        for other, other_first_window in self._open_runs.items():
+            pair = (person, other) if person < other else (other, person)
+            shared = last_window - max(first_window, other_first_window) + 1
+            pair_counts[pair] = pair_counts.get(pair, 0) + shared
+
+    def add(self, persons: Iterable[int]) -> None:
+        """
+        Adds the next sentence, given by the persons it mentions.
+        """
+        self.sentences_count += 1
+        if self.k == 0:
+            return
+
+        persons = set(persons)
+        mentions = self._mentions
+        self._window.append(persons)
+        for person in persons:
+            mentions[person] = mentions.get(person, 0) + 1
+
+        left = ()
+        if len(self._window) > self.k:
+            left = self._window.popleft()
+            for person in left:
+                mentions[person] -= 1
+                if mentions[person] == 0:
+                    del mentions[person]
+
+        if len(self._window) < self.k:
+            return
+
+        window = self._windows_count
+        for person in left:
+            if person not in mentions:
+                self._end_run(person, window - 1)
+        for person in (mentions if window == 0 else persons):
+            if person not in self._open_runs:
+                self._open_runs[person] = window
+        self._windows_count += 1
+
+    def finish(self) -> dict[tuple[int, int], int]:
+        """
+        Ends the runs still open at the last window.
+        :return: pair_counts
+        """
+        last_window = self._windows_count - 1
+        for person in list(self._open_runs):
+            self._end_run(person, last_window)
+        return self.pair_counts
+
+
+class ReachabilityIndex:
+    """
+    Answers bounded connection queries over an undirected graph, built once for all the queries.
+
+    The connected components are labelled once. Two persons in different components are never
+    connected, and two persons of the same component are always connected when the maximal
+    distance is at least the component size minus one, which is the longest a shortest path can
+    be.
+
+    On large graphs a landmark oracle is also precomputed: the distances from a few well-connected
+    persons to everyone. For persons u, v and a landmark l, |d(l, u) - d(l, v)| <= d(u, v) <=
+    d(l, u) + d(l, v), so most pairs are "definitely within d" or "definitely not" without a search.
+
+    The remaining pairs are searched with a bidirectional BFS that stops at the maximal distance:
+    each step expands the smaller of the two frontiers, so the middle hops of a long search are
+    never explored from a single side. The result of every searched pair is cached, for both orders.
+
+    The persons are the keys of graph, the person ids of a CSRGraph in Task 7. A query person that
+    is None or not in graph, such as a name missing from the graph, is connected to nobody.
+
+    Attributes:
+        graph (Mapping[Hashable, Iterable[Hashable]]): The neighbours of every person.
+        labels (dict[Hashable, int]): The component of every person.
+        component_sizes (list[int]): The number of persons in every component.
+        landmarks (list[dict[Hashable, int]]): The distances from every landmark to its component.
+    """
+
+    def __init__(self, graph: Mapping[Hashable, Iterable[Hashable]], landmarks_count: int | None = None):
+        self.graph = graph
+        self.labels: dict[Hashable, int] = {}
+        self.component_sizes: list[int] = []
+        self.landmarks: list[dict[Hashable, int]] = []
+        self._searched: dict[tuple[Hashable, Hashable], tuple[int, int | None]] = {}
+
+        for start in graph:
+            if start not in self.labels:
+                component = self._bfs(start)
+                label = len(self.component_sizes)
+                for person in component:
+                    self.labels[person] = label
+                self.component_sizes.append(len(component))
+
+        if landmarks_count is None:
+            landmarks_count = LANDMARKS_COUNT if len(graph) >= LANDMARKS_MIN_PERSONS else 0
+        by_degree = sorted(graph, key=lambda person: len(graph[person]), reverse=True)
+        for landmark in by_degree[:landmarks_count]:
+            self.landmarks.append(self._bfs(landmark))
+
+    def _bfs(self, source: Hashable) -> dict[Hashable, int]:
+        """
+        Returns the distance from source of every person of its component.
+        """
+        distances = {source: 0}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            for neighbor in self.graph.get(current, ()):
+                if neighbor not in distances:
+                    distances[neighbor] = distances[current] + 1
+                    queue.append(neighbor)
+        return distances
+
+    def distance_bounds(self, person1: Hashable, person2: Hashable) -> tuple[int, int | None]:
+        """
+        Returns a lower and an upper bound (None if unknown) of the distance of two persons of the
+        same component, from the landmarks.
+        """
+        lower, upper = 0, None
+        for distances in self.landmarks:
+            distance1 = distances.get(person1)
+            distance2 = distances.get(person2)
+            if distance1 is None or distance2 is None:
+                continue
+            lower = max(lower, abs(distance1 - distance2))
+            if upper is None or distance1 + distance2 < upper:
+                upper = distance1 + distance2
+        return lower, upper
+
+    def bounded_distance(self, source: Hashable, target: Hashable, max_dist: int) -> int | None:
+        """
+        Returns the distance of two persons with a bidirectional BFS, or None if it is more than max_dist.
+        """
+        if source == target:
+            return 0
+
+        forward, backward = {source: 0}, {target: 0}
+        forward_frontier, backward_frontier = [source], [target]
+        forward_depth = backward_depth = 0
+        while forward_frontier and backward_frontier and forward_depth + backward_depth < max_dist:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, seen, other, depth = forward_frontier, forward, backward, forward_depth
+            else:
+                frontier, seen, other, depth = backward_frontier, backward, forward, backward_depth
+
+            best = None
+            next_frontier = []
+            for current in frontier:
+                for neighbor in self.graph.get(current, ()):
+                    if neighbor in other:
+                        length = depth + 1 + other[neighbor]
+                        if best is None or length < best:
+                            best = length
+                    if neighbor not in seen:
+                        seen[neighbor] = depth + 1
+                        next_frontier.append(neighbor)
+            if best is not None:
+                return best
+
+            if seen is forward:
+                forward_frontier, forward_depth = next_frontier, forward_depth + 1
+            else:
+                backward_frontier, backward_depth = next_frontier, backward_depth + 1
+
+        return None
+
+    def is_connected_within(self, person1: Hashable | None, person2: Hashable | None, max_dist: int) -> bool:
+        """
+        Checks if two persons of the graph are connected by a path of at most max_dist edges.
+        """
+        if person1 not in self.graph or person2 not in self.graph:
+            return False
+
+        if person1 == person2:
+            return True
+
+        label = self.labels[person1]
+        if label != self.labels[person2]:
+            return False
+
+        if max_dist >= self.component_sizes[label] - 1:
+            return True
+
+        lower, upper = self.distance_bounds(person1, person2)
+        if upper is not None and upper <= max_dist:
+            return True
+        if lower > max_dist:
+            return False
+
+        pair = (person1, person2) if person1 < person2 else (person2, person1)
+        searched = self._searched.get(pair)
+        if searched is None or searched[0] < max_dist:
+            searched = (max_dist, self.bounded_distance(person1, person2, max_dist))
+            self._searched[pair] = searched
+        return searched[1] is not None and searched[1] <= max_dist
+
+
+class SimplePathFinder:
+    """
+    Decides whether two persons are the two ends of a simple path (no person twice) of exactly
+    a given number of persons, in an undirected graph. The queries of one source are answered
+    together: one search from the source marks every target it reaches.
+
+    Only the targets in the source's component can be reached, and none when the path is longer
+    than that component. The BFS distances to the nearest target are then computed once. A path
+    that still has r edges to go can only continue to a person at most r edges from a target, so
+    the search never enters a branch that cannot end at a target on time.
+
+    Paths of at most max_colour_persons persons are found by colour-coding: every person gets one
+    of c >= L random colours, and the paths whose persons all have different colours are found
+    layer by layer, keeping only the set of colours used (a bitmask) per end person instead of the
+    paths themselves. Such a path is always simple, so a target reached this way is a sure answer,
+    and a given path gets different colours with probability c! / ((c - L)! c^L). Enough colourings
+    are run for a path to be missed with probability at most error_probability, so the time is
+    polynomial in the size of the graph for a fixed L. The colourings are run together: bit r of
+    an int stands for colouring r, so one pass over the edges advances a whole batch of them.
+
+    Longer paths are decided by an exact depth-first search with backtracking, which keeps only
+    the current path and stops as soon as every target is reached.
+
+    The persons are the keys of graph, the person ids of a CSRGraph in Task 8. A source or target
+    that is None or not in graph, such as a name missing from the graph, has no path.
+
+    Attributes:
+        graph (Mapping[Hashable, Iterable[Hashable]]): The neighbours of every person.
+        max_colour_persons (int): The longest paths decided by colour-coding.
+        error_probability (float): The probability that colour-coding misses a path.
+    """
+
+    def __init__(self, graph: Mapping[Hashable, Iterable[Hashable]],
+                 max_colour_persons: int = COLOUR_CODING_MAX_PERSONS,
+                 error_probability: float = COLOUR_CODING_ERROR, seed: int = 0):
+        self.graph = graph
+        self.max_colour_persons = max_colour_persons
+        self.error_probability = error_probability
+        self._random = random.Random(seed)
+        self._distances: dict[Hashable, dict[Hashable, int]] = {}
+
+    def _distances_from(self, sources: Iterable[Hashable]) -> dict[Hashable, int]:
+        """
+        Returns the distance to the nearest of the sources of every person of their components.
+        """
+        distances = dict.fromkeys(sources, 0)
+        queue = deque(distances)
+        while queue:
+            current = queue.popleft()
+            for neighbor in self.graph.get(current, ()):
+                if neighbor not in distances:
+                    distances[neighbor] = distances[current] + 1
+                    queue.append(neighbor)
+        return distances
+
+    def distances_to(self, target: Hashable) -> dict[Hashable, int]:
+        """
+        Returns the distance to target of every person of its component.
+        """
+        distances = self._distances.get(target)
+        if distances is None:
+            distances = self._distances[target] = self._distances_from([target])
+        return distances
+
+    def has_path(self, source: Hashable | None, target: Hashable | None, persons_count: int) -> bool:
+        """
+        Checks if a simple path of exactly persons_count persons goes from source to target.
+        """
+        return target in self.targets_with_path(source, [target], persons_count)
+
+    def targets_with_path(self, source: Hashable | None, targets: Iterable[Hashable | None],
+                          persons_count: int) -> set[Hashable]:
+        """
+        Returns the targets that a simple path of exactly persons_count persons joins to source.
+        """
+        if source not in self.graph or persons_count < 1:
+            return set()
+
+        component = self.distances_to(source)
+        targets = {target for target in targets if target in component}
+        if persons_count == 1:
+            return targets & {source}
+
+        targets.discard(source)
+        if not targets or persons_count > len(component):
+            return set()
+
+        distances = self.distances_to(next(iter(targets))) if len(targets) == 1 else self._distances_from(targets)
+        if persons_count <= self.max_colour_persons:
+            return self._colour_coding(source, targets, persons_count, distances)
+        return self._depth_first_search(source, targets, persons_count - 1, distances)
+
+    def colourings_count(self, persons_count: int) -> int:
+        """
+        Returns the number of colourings after which a path of persons_count persons is missed
+        with probability at most error_probability, with the colours of _colour_coding.
+        """
+        colours_count = 1 << (persons_count - 1).bit_length()
+        all_different = math.perm(colours_count, persons_count) / colours_count ** persons_count
+        return max(1, math.ceil(math.log(1 / self.error_probability) / all_different))
+
+    def _colour_sets(self, batch: int, colours_count: int) -> list[int]:
+        """
+        Returns, for every colour, the colourings of a batch (as the bits of an int) in which a
+        person gets that colour. colours_count is a power of two, so the colour of a person is
+        made of the bits of log2(colours_count) random ints.
+        """
+        full = (1 << batch) - 1
+        randoms = [self._random.getrandbits(batch) for _ in range(colours_count.bit_length() - 1)]
+        colour_sets = []
+        for colour in range(colours_count):
+            colourings = full
+            for bit, bits in enumerate(randoms):
+                colourings &= bits if colour >> bit & 1 else ~bits
+            colour_sets.append(colourings)
+        return colour_sets
+
+    def _colour_coding(self, source: Hashable, targets: set[Hashable], persons_count: int,
+                       distances: dict[Hashable, int]) -> set[Hashable]:
+        """
+        Returns the targets reached by a path of persons_count persons with all different colours
+        in one of the colourings, running the colourings in batches until every target is found.
+        """
+        graph = self.graph
+        colours_count = 1 << (persons_count - 1).bit_length()
+        pending = self.colourings_count(persons_count)
+        found = set()
+        while pending > 0 and len(found) < len(targets):
+            batch = min(pending, COLOUR_CODING_BATCH)
+            pending -= batch
+            colour_sets: dict[Hashable, list[int]] = {}
+
+            def colourings_of(person: Hashable) -> list[int]:
+                sets = colour_sets.get(person)
+                if sets is None:
+                    sets = colour_sets[person] = self._colour_sets(batch, colours_count)
+                return sets
+
+            # for every end person, the colourings that reach it for every set of used colours
+            layer = {source: {1 << colour: colourings for colour, colourings in enumerate(colourings_of(source))
+                              if colourings}}
+            for step in range(1, persons_count):
+                remaining = persons_count - 1 - step
+                next_layer: dict[Hashable, dict[int, int]] = {}
+                for person, masks in layer.items():
+                    for neighbor in graph.get(person, ()):
+                        distance = distances.get(neighbor)
+                        if distance is None or distance > remaining:
+                            continue
+                        neighbor_sets = colourings_of(neighbor)
+                        neighbor_masks = next_layer.setdefault(neighbor, {})
+                        for mask, colourings in masks.items():
+                            for colour, colour_colourings in enumerate(neighbor_sets):
+                                if mask >> colour & 1:
+                                    continue
+                                reached = colourings & colour_colourings
+                                if reached:
+                                    new_mask = mask | 1 << colour
+                                    neighbor_masks[new_mask] = neighbor_masks.get(new_mask, 0) | reached
+                layer = {person: masks for person, masks in next_layer.items() if masks}
+                if not layer:
+                    break
+
+            found.update(target for target in layer if target in targets)
+
+        return found
+
+    def _depth_first_search(self, source: Hashable, targets: set[Hashable], edges: int,
+                            distances: dict[Hashable, int]) -> set[Hashable]:
+        """
+        Returns the targets at the end of a simple path of exactly edges edges, extending and
+        backtracking a single path.
+        """
+        graph = self.graph
+        found = set()
+        on_path = {source}
+        stack = [(source, iter(graph.get(source, ())))]
+        while stack and len(found) < len(targets):
+            current, neighbors = stack[-1]
+            remaining = edges - len(stack)
+            for neighbor in neighbors:
+                if neighbor in on_path:
+                    continue
+                distance = distances.get(neighbor)
+                if distance is None or distance > remaining:
+                    continue
+                if remaining == 0:
+                    found.add(neighbor)
+                    continue
+                on_path.add(neighbor)
+                stack.append((neighbor, iter(graph.get(neighbor, ()))))
+                break
+            else:
+                stack.pop()
+                on_path.discard(current)
+
+        return found
+
+
+def sparse_window_cooccurrence(sentences_persons: Iterable[Iterable[int]], persons_count: int, k: int)\
+        -> tuple[dict[tuple[int, int], int], int]:
+    """
+    Counts the windows of k consecutive sentences shared by every pair of persons with sparse
+    matrices, for dense corpora:
+        - presence (persons x windows) has a 1 where a window holds a sentence that mentions the
+          person. It is the convolution of every person row with the k-window, built row by row:
+          the mentions of a person, in sentence order, become runs of windows that are merged
+          where they overlap, so it holds at most k entries per mention and no band matrix of
+          sentences x windows is needed;
+        - presence @ presence.T then holds, for every pair of persons, the windows they share.
+    NumPy and SciPy are imported only when this engine is used.
+    :return: the counts of the pairs (i < j) that share a window, and the number of sentences
+    """
+    import numpy as np
+    from scipy import sparse
+
+    rows = array('I')
+    columns = array('I')
+    sentences_count = 0
+    for sentence_id, persons in enumerate(sentences_persons):
+        sentences_count += 1
+        for person in persons:
+            rows.append(person)
+            columns.append(sentence_id)
+
+    if k == 0 or k > sentences_count or not rows:
+        return {}, sentences_count
+
+    windows_count = sentences_count - k + 1
+    persons = np.frombuffer(rows, dtype=np.uint32).astype(np.int64)
+    sentences = np.frombuffer(columns, dtype=np.uint32).astype(np.int64)
+    order = np.lexsort((sentences, persons))
+    persons, sentences = persons[order], sentences[order]
+
+    # the windows of a mention are first..last; both grow with the sentence, so the runs of one
+    # person overlap only the run before them
+    first = np.maximum(sentences - k + 1, 0)
+    last = np.minimum(sentences, windows_count - 1)
+    new_run = np.ones(len(persons), dtype=bool)
+    new_run[1:] = (persons[1:] != persons[:-1]) | (first[1:] > last[:-1] + 1)
+    run_starts = np.flatnonzero(new_run)
+    run_ends = np.append(run_starts[1:], len(persons)) - 1
+    run_first, run_lengths = first[run_starts], last[run_ends] - first[run_starts] + 1
+
+    offsets = np.repeat(np.cumsum(run_lengths) - run_lengths, run_lengths)
+    windows = np.arange(int(run_lengths.sum())) - offsets + np.repeat(run_first, run_lengths)
+    presence = sparse.csr_matrix((np.ones(len(windows), dtype=np.int32),
+                                  (np.repeat(persons[run_starts], run_lengths), windows)),
+                                 shape=(persons_count, windows_count))
+    shared = sparse.triu(presence @ presence.T, k=1).tocoo()
+    pair_counts = {(int(i), int(j)): int(count) for i, j, count in zip(shared.row, shared.col, shared.data) if count}
+    return pair_counts, sentences_count
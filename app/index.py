@@ -0,0 +1,278 @@
+"""
+This module implements the indexes built over the encoded sentences and the names table.
+
+Classes:
+    - NameMatcher: Finds every person mentioned in a sentence in a single pass over its words.
+    - InvertedIndex: Maps every word id to the sorted ids of the sentences that contain it.
+    - SuffixArrayIndex: Finds every occurrence of a k-seq in the sentences, for any k.
+"""
+
+# Import python library:
+import bisect
+from array import array
+from collections.abc import Container, Iterable, Sequence
+
+# Import project files:
+from . import corpus
+
+INDEX_EXTENSION = ".index"
+
+
+class NameMatcher:
+    """
+    A matcher compiled once from the cleaned names table.
+
+    A person is mentioned by a word of a sentence when the word equals one of the person's name
+    words: the words of the main name and any other name given as a plain word. Other names given
+    as lists of words never equal a single word, so they never match, exactly like the
+    `name in sentence` / `sentence.count(name)` checks of the tasks. Every pattern is therefore a
+    single word, and the compiled matcher is a table from word id to the persons it names;
+    matching a sentence is one lookup per word.
+
+    Attributes:
+        vocabulary (corpus.Vocabulary): The word ids shared with the encoded sentences.
+        persons (list[str]): The main name of every person, in the order of the names table.
+        name_ids (list[list[int]]): The distinct name word ids of every person.
+        table (dict[int, list[tuple[int, int]]]): For every name word id, the persons it names
+                                                  and how many of their name words it is.
+    """
+
+    def __init__(self, names_list: list, vocabulary: corpus.Vocabulary):
+        self.vocabulary = vocabulary
+        self.persons: list[str] = []
+        self.name_ids: list[list[int]] = []
+        self.table: dict[int, list[tuple[int, int]]] = {}
+
+        for person, full_name in enumerate(names_list):
+            if not full_name:
+                self.persons.append('')
+                self.name_ids.append([])
+                continue
+            self.persons.append(" ".join(full_name[0]))
+            name_words = [name for name in full_name[0] if isinstance(name, str)]
+            if len(full_name) > 1 and full_name[1]:
+                name_words += [name for name in full_name[1] if isinstance(name, str)]
+
+            multiplicity: dict[int, int] = {}
+            for name in name_words:
+                word_id = vocabulary.add(name)
+                multiplicity[word_id] = multiplicity.get(word_id, 0) + 1
+            self.name_ids.append(list(multiplicity))
+            for word_id, count in multiplicity.items():
+                self.table.setdefault(word_id, []).append((person, count))
+
+    def count_mentions(self, sentence_ids: Sequence[int], counts: list[int]) -> None:
+        """
+        Adds the mentions of every person in one encoded sentence to counts (indexed by person).
+        """
+        table = self.table
+        for word_id in sentence_ids:
+            entries = table.get(word_id)
+            if entries is not None:
+                for person, count in entries:
+                    counts[person] += count
+
+    def persons_in(self, sentence_ids: Sequence[int]) -> set[int]:
+        """
+        Returns the persons mentioned in one encoded sentence.
+        """
+        found = set()
+        table = self.table
+        for word_id in sentence_ids:
+            entries = table.get(word_id)
+            if entries is not None:
+                found.update(person for person, _ in entries)
+        return found
+
+    def count_all_mentions(self, sentences: Iterable[list[str]]) -> list[int]:
+        """
+        Counts the mentions of every person over all the sentences, in a single pass.
+        """
+        counts = [0] * len(self.persons)
+        for sentence_ids in corpus.iter_encoded_sentences(sentences, self.vocabulary):
+            self.count_mentions(sentence_ids, counts)
+        return counts
+
+
+class InvertedIndex:
+    """
+    An inverted index over encoded sentences: for every word id, the sorted list of the ids
+    (positions) of the sentences that contain it, its posting list.
+
+    The sentences are read once. Only the word ids in word_ids are indexed when it is given, so
+    an index over the name words keeps a posting only for every mention.
+
+    Attributes:
+        postings (dict[int, array]): The posting list of every indexed word id.
+        sentences_count (int): The number of indexed sentences.
+    """
+
+    def __init__(self, sentences: Iterable[Sequence[int]], word_ids: Container[int] | None = None):
+        self.postings: dict[int, array] = {}
+        self.sentences_count = 0
+        for sentence_id, sentence_ids in enumerate(sentences):
+            self.sentences_count += 1
+            for word_id in set(sentence_ids):
+                if word_ids is None or word_id in word_ids:
+                    posting = self.postings.get(word_id)
+                    if posting is None:
+                        posting = self.postings[word_id] = array('I')
+                    posting.append(sentence_id)
+
+    def posting(self, word_id: int) -> Sequence[int]:
+        """
+        Returns the sorted ids of the sentences that contain a word.
+        """
+        return self.postings.get(word_id, ())
+
+    def union(self, word_ids: Iterable[int]) -> list[int]:
+        """
+        Returns the sorted ids of the sentences that contain at least one of the words.
+        """
+        postings = [self.postings[word_id] for word_id in word_ids if word_id in self.postings]
+        if len(postings) == 1:
+            return list(postings[0])
+        return sorted(set().union(*postings))
+
+
+def intersect(first: Sequence[int], second: Sequence[int]) -> list[int]:
+    """
+    Returns the ids found in both sorted posting lists.
+    """
+    result = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        if first[i] < second[j]:
+            i += 1
+        elif first[i] > second[j]:
+            j += 1
+        else:
+            result.append(first[i])
+            i += 1
+            j += 1
+    return result
+
+
+class SuffixArrayIndex:
+    """
+    A suffix array over the word ids of all sentences.
+
+    The sentences are laid out one after the other in a single text, each word id shifted by one
+    and every sentence followed by the separator 0. The suffix array lists the start of every
+    suffix of that text in sorted order, so all the occurrences of a k-seq are one contiguous
+    range of it, found by binary search. A k-seq never contains the separator, so it never matches
+    across two sentences.
+
+    The index takes a few integers per word, whatever the k-seq lengths that are queried. It can
+    be stored with its sentences in an index file and memory-mapped back, see write_index.
+
+    Attributes:
+        text (array): The shifted word ids of all sentences, with the separators.
+        starts (array): The position of the first word of every sentence in text.
+        suffix_array (array): The start of every suffix of text, in sorted order.
+    """
+
+    def __init__(self, sentences: Iterable[Sequence[int]]):
+        self.text = array('I')
+        self.starts = array('Q')
+        longest = 0
+        for sentence_ids in sentences:
+            self.starts.append(len(self.text))
+            self.text.extend([word_id + 1 for word_id in sentence_ids])
+            self.text.append(0)
+            longest = max(longest, len(sentence_ids))
+        self.suffix_array = build_suffix_array(self.text, longest + 1)
+
+    @classmethod
+    def from_mapped(cls, mapped_corpus: corpus.MappedCorpus) -> 'SuffixArrayIndex':
+        """
+        Reads the index stored in an index file, without copying it.
+        """
+        suffix_index = cls(())
+        suffix_index.text = mapped_corpus.array_section('text', 'I')
+        suffix_index.starts = mapped_corpus.array_section('starts', 'Q')
+        suffix_index.suffix_array = mapped_corpus.array_section('suffixes', 'Q')
+        if suffix_index.text is None or suffix_index.starts is None or suffix_index.suffix_array is None:
+            raise ValueError('the corpus file holds no suffix array index')
+        return suffix_index
+
+    def sections(self) -> list[tuple[str, bytes]]:
+        """
+        Returns the sections that store the index in a corpus file.
+        """
+        return [
+            ('text', corpus.little_endian(self.text)),
+            ('starts', corpus.little_endian(self.starts)),
+            ('suffixes', corpus.little_endian(self.suffix_array)),
+        ]
+
+    def find(self, seq_ids: Sequence[int]) -> list[int]:
+        """
+        Returns the id of the sentence of every occurrence of a k-seq, in increasing order: a
+        sentence that contains the k-seq several times appears as many times.
+        """
+        if not seq_ids:
+            return []
+        query = [word_id + 1 for word_id in seq_ids]
+        text, length = self.text, len(query)
+        first = bisect.bisect_left(self.suffix_array, query, key=lambda start: text[start:start + length].tolist())
+        last = bisect.bisect_right(self.suffix_array, query, lo=first,
+                                   key=lambda start: text[start:start + length].tolist())
+        return sorted(bisect.bisect_right(self.starts, start) - 1 for start in self.suffix_array[first:last])
+
+
+def write_index(file_path: str, sentences: Iterable[list[str]]) -> tuple[corpus.EncodedCorpus, SuffixArrayIndex]:
+    """
+    Builds the suffix array index of the sorted sentences and writes both into an index file: a
+    corpus file of the sorted sentences with the index sections added.
+    :return: the sorted encoded sentences and their index
+    """
+    sorted_sentences = sorted(sentences)
+    encoded_corpus = corpus.EncodedCorpus(sorted_sentences)
+    suffix_index = SuffixArrayIndex(encoded_corpus)
+    corpus.write_corpus(file_path, sorted_sentences, [], encoded_corpus.vocabulary, suffix_index.sections())
+    return encoded_corpus, suffix_index
+
+
+def load_index(file_path: str) -> tuple[corpus.MappedCorpus, SuffixArrayIndex]:
+    """
+    Memory-maps an index file written by write_index.
+    :return: the sorted sentences and their index
+    """
+    mapped_corpus = corpus.MappedCorpus(file_path)
+    return mapped_corpus, SuffixArrayIndex.from_mapped(mapped_corpus)
+
+
+def build_suffix_array(text: Sequence[int], depth: int) -> array:
+    """
+    Sorts the suffixes of text by prefix doubling: after each round the suffixes are ordered by
+    their first 2 * k symbols. Only the first depth symbols of every suffix are needed to answer
+    queries, so the rounds stop once k reaches depth or every suffix has its own rank.
+    """
+    size = len(text)
+    if size == 0:
+        return array('Q')
+
+    rank = list(text)
+    suffix_array = sorted(range(size), key=rank.__getitem__)
+    k = 1
+    while k < depth:
+        def sort_key(start: int) -> tuple[int, int]:
+            return rank[start], rank[start + k] + 1 if start + k < size else 0
+
+        suffix_array.sort(key=sort_key)
+        new_rank = [0] * size
+        current_rank = 0
+        previous_key = sort_key(suffix_array[0])
+        for start in suffix_array:
+            key = sort_key(start)
+            if key != previous_key:
+                current_rank += 1
+                previous_key = key
+            new_rank[start] = current_rank
+        rank = new_rank
+        if current_rank == size - 1:
+            break
+        k *= 2
+
+    return array('Q', suffix_array)
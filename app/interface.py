@@ -15,6 +15,8 @@ import sys
 
 # import project files:
 from . import logic
+from . import output
+from . import validation
 
 
 def user_interface():
@@ -43,12 +45,30 @@ def user_interface():
     parser.add_argument('--pairs', type=str, help="pairs file")
     parser.add_argument('--maximal_distance', type=int, help="maximal_distance")
     parser.add_argument('--fixed_length', type=int, help="fixed_length")
+    parser.add_argument('--workers', type=int, help="number of cleaning processes for task 1")
+    parser.add_argument('--save_preprocessed', type=str, help="binary preprocessed corpus file written by task 1")
+    parser.add_argument('--top', type=int, help="keep only the K most frequent k-seqs of each k (task 2)")
+    parser.add_argument('--min_count', '--min-count', type=int, help="keep only k-seqs seen at least C times (task 2)")
+    parser.add_argument('--build_index', type=str, help="index file written by task 4")
+    parser.add_argument('--index', type=str, help="index file queried by task 4 instead of the sentences")
+    parser.add_argument('--engine', type=str, help="engine of task 6 (python or sparse) or of task 9 (python, minhash or sparse)")
+    parser.add_argument('--save_graph', type=str, help="graph file written by task 6 for tasks 7 and 8")
+    parser.add_argument('--thresholds', type=str, help="comma-separated thresholds grouped in one run (task 9)")
+    parser.add_argument('--dendrogram', action='store_true', help="print the single-linkage merges (task 9)")
+    parser.add_argument('--output', type=str, help="JSON file the result is written into instead of the screen")
+    parser.add_argument('--compact', action='store_true', help="write the result without indentation")
+    parser.add_argument('--sentence_ids', action='store_true',
+                        help="reference the sentences by id, in a table written once (tasks 4, 5 and 9)")
+    parser.add_argument('--serve', type=str, help="HOST:PORT or unix:PATH the query server of task 10 listens on")
     args = parser.parse_args()
 
-    if args.task not in [1, 2, 3, 4, 5, 6, 7, 8, 9]:
+    if args.task not in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]:
         print("invalid input")
         sys.exit(1)
 
+    validation.validate_output_args(args)
+    output.configure(args.output, args.compact)
+
     if args.task == 1:
         task = logic.CleanText(args)
 
@@ -76,6 +96,9 @@ def user_interface():
     if args.task == 9:
         task = logic.SentenceClustering(args)
 
+    if args.task == 10:
+        task = logic.LocalQueryServer(args)
+
     return task
 
 
@@ -6,17 +6,25 @@ It contains the main logic for each task, including:
 - Search and graph operations
 - Name recognition and context analysis
 
-Each Task class (Task1 to Task9) imports and uses functions from this module as needed.
+Each Task class (Task1 to Task10) imports and uses functions from this module as needed.
 """
 
 # Import python library:
 import json
 import argparse
 import sys
-from collections import defaultdict, deque
+from collections import defaultdict
+from collections.abc import Iterator
 
 # Import project files:
 from . import Text_Cleaner
+from . import clustering
+from . import corpus
+from . import graph
+from . import index
+from . import output
+from . import sequences
+from . import server
 from . import utils
 from . import validation
 
@@ -33,12 +41,18 @@ class CleanText:
         self.filename_sentences = args.sentences
         self.filename_remove_names = args.remove_words
         self.filename_names = args.names
+        self.workers = args.workers if args.workers is not None else 1
+        self.filename_save_preprocessed = args.save_preprocessed
 
     def run(self):
-        clean_sentence_list = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names)
-        clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names)
-        self.sentence_list = clean_sentence_list.generate_clean_sentences_list()
+        pipeline = Text_Cleaner.CleanerPipeline.from_csv(self.filename_remove_names)
+        clean_sentence_list = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names,
+                                                          pipeline)
+        clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names, pipeline)
+        self.sentence_list = clean_sentence_list.generate_clean_sentences_list(self.workers)
         self.names_list = clean_names_list.generate_clean_names_list()
+        if self.filename_save_preprocessed:
+            corpus.write_corpus(self.filename_save_preprocessed, self.sentence_list, self.names_list)
 
     def print_in_json(self):
         """
@@ -50,7 +64,7 @@ class CleanText:
             "Processed Names": self.names_list
         }}
 
-        print(json.dumps(data, indent=4))
+        output.print_json(data)
 
 
 class CountingSequences:
@@ -70,6 +84,9 @@ class CountingSequences:
         self.sentence_list = None
         validation.validate_args_CountingSequences(args)
         self.n = args.maxk
+        self.top = args.top
+        self.min_count = args.min_count
+        self.truncated = []
         self.filename_remove_names = args.remove_words
         self.filename_sentences = args.sentences
         self.filename_preprocessed = args.preprocessed
@@ -77,7 +94,7 @@ class CountingSequences:
     def run(self):
         if self.filename_sentences:
             all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names)
-            self.sentence_list = all_sentences.generate_clean_sentences_list()
+            self.sentence_list = all_sentences
 
         elif self.filename_preprocessed:
             clean_sentence_and_names = utils.task1_into_lists(self.filename_preprocessed)
@@ -86,14 +103,19 @@ class CountingSequences:
 
     def seq_dict(self, sentence_list: list[list[str]]) -> dict[str, int]:
         """
-        this func receives a list of sentences and returns a dict with the count of each seq
+        this func receives a list of sentences and returns a dict with the count of each seq.
+        all the k-seqs for 1 <= k <= N are counted in a single pass over the sentences.
+        with --top or --min_count only the head of the distribution is kept, in bounded memory,
+        and the k whose top seqs are only their guaranteed-exact prefix are kept in self.truncated
         :param sentence_list:
         :return:
         """
-        final_list = []
-        for i in range(self.n):
-            final_list.append(utils.put_in_format_task2(sentence_list, i + 1))
-        return final_list
+        if self.top is not None or self.min_count is not None:
+            counter = sequences.PrunedNGramCounter(self.n, self.top, self.min_count).count(sentence_list)
+            self.truncated = [f'{k}_seq' for k in counter.truncated]
+            return counter.to_list()
+
+        return sequences.NGramCounter(self.n).count(sentence_list).to_list()
 
     def print_in_json(self):
         """
@@ -104,7 +126,9 @@ class CountingSequences:
             f'{self.n}-Seq Counts': self.seq_dict(self.sentence_list)
 
         }}
-        print(json.dumps(data, indent=4))
+        if self.truncated:
+            data["Question 2"]['Truncated K-Seqs'] = self.truncated
+        output.print_json(data)
 
 
 class CountingPersonMentions:
@@ -133,9 +157,10 @@ class CountingPersonMentions:
 
     def run(self):
         if self.filename_sentences:
-            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names)
-            self.sentence_list = all_sentences.generate_clean_sentences_list()
-            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names)
+            pipeline = Text_Cleaner.CleanerPipeline.from_csv(self.filename_remove_names)
+            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names, pipeline)
+            self.sentence_list = all_sentences
+            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names, pipeline)
             self.names_list = clean_names_list.generate_clean_names_list()
 
         elif self.filename_preprocessed:
@@ -152,7 +177,7 @@ class CountingPersonMentions:
             'Name Mentions': utils.change_dict_into_list_q3(self.sentence_list, self.names_list)
 
         }}
-        print(json.dumps(data, indent=4))
+        output.print_json(data)
 
 
 class SearchEngine:
@@ -169,6 +194,10 @@ class SearchEngine:
     Use Case:
         Efficiently find all sentences that contain specific k-word sequences.
 
+    With --build_index the index is also written to an index file, and with --index a stored
+    index is memory-mapped and queried without reading or cleaning the sentences again, so one
+    corpus is indexed once and queried many times.
+
     Notes:
         - The construction of the internal index may take more than O(1), but each individual
           lookup is guaranteed to be constant time.
@@ -179,14 +208,22 @@ class SearchEngine:
 
     def __init__(self, args: argparse.Namespace):
         self.sentence_list = None
+        self.suffix_index = None
         validation.validate_args_SearchEngine(args)
         self.kseq_keys = args.qsek_query_path
         self.filename_remove_names = args.remove_words
         self.filename_sentences = args.sentences
         self.filename_names = args.names
         self.filename_preprocessed = args.preprocessed
+        self.filename_build_index = args.build_index
+        self.filename_index = args.index
+        self.sentence_ids = args.sentence_ids
 
     def run(self):
+        if self.filename_index:
+            self.sentence_list, self.suffix_index = utils.load_search_index(self.filename_index)
+            return
+
         if self.filename_sentences:
             all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names)
             self.sentence_list = all_sentences.generate_clean_sentences_list()
@@ -195,6 +232,9 @@ class SearchEngine:
             clean_sentence_and_names = utils.task1_into_lists(self.filename_preprocessed)
             self.sentence_list = clean_sentence_and_names[0]
 
+        if self.filename_build_index:
+            self.sentence_list, self.suffix_index = index.write_index(self.filename_build_index, self.sentence_list)
+
     def open_json_file(self):
         """
         this func opens json file
@@ -223,17 +263,25 @@ class SearchEngine:
 
     def print_in_json(self):
         """
-        this func runs task 4
+        this func runs task 4. when only an index is built there is nothing to search
         """
+        if self.kseq_keys is None:
+            return
+
         clean_search_seq_list = self.combine_json_list()
         no_dup_seq_dict = utils.remove_duplicates_seq(clean_search_seq_list)
-        possible_seq_dict = utils.generate_all_search_seq_from_sentences_list(self.sentence_list)
-        seq_dict = utils.count_seq_in_sentence(possible_seq_dict, no_dup_seq_dict)
+        if self.suffix_index is None:
+            self.sentence_list, self.suffix_index = utils.build_search_index(self.sentence_list)
+        # the matches are decoded one seq at a time, while they are written
+        table = output.SentenceTable() if self.sentence_ids else None
+        seq_dict = utils.iter_seq_in_index(self.sentence_list, self.suffix_index, no_dup_seq_dict, table)
         data = {"Question 4": {
             'K-Seq Matches': seq_dict
 
         }}
-        print(json.dumps(data, indent=4))
+        if table is not None:
+            data["Question 4"]['Sentences'] = table.sentences()
+        output.print_json(data)
 
 
 class PersonContextAnalyzer:
@@ -271,15 +319,17 @@ class PersonContextAnalyzer:
         self.filename_sentences = args.sentences
         self.filename_names = args.names
         self.filename_preprocessed = args.preprocessed
+        self.sentence_ids = args.sentence_ids
         self.args.names = None
         self.args.maxk = None
         self.args.qsek_query_path = "ignore.json"
 
     def run(self):
         if self.filename_sentences:
-            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names)
+            pipeline = Text_Cleaner.CleanerPipeline.from_csv(self.filename_remove_names)
+            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names, pipeline)
             self.sentence_list = all_sentences.generate_clean_sentences_list()
-            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names)
+            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names, pipeline)
             self.names_list = clean_names_list.generate_clean_names_list()
 
 
@@ -288,26 +338,25 @@ class PersonContextAnalyzer:
             self.sentence_list = clean_sentence_and_names[0]
             self.names_list = clean_sentence_and_names[1]
 
-    def get_sentences_with_search_names(self, names_santances_dict: dict[str, list[str]]) -> list[list[str]]:
+    def get_sentences_with_search_names(self, names_santances_dict: dict[str, list[str]],
+                                        table: output.SentenceTable | None = None) -> Iterator[list]:
         """
-        this func returns a list of lists when the first item, is the name and all possible
-         seq of the associated santances as values
-        :return: list[list[str]]
+        this func yields a list for every name, when the first item is the name and all possible
+         seq of the associated santances as values. each name is yielded while the output is written.
+         with a table the seqs are replaced by their ids in the table
+        :return: Iterator[list]
         """
-        res = []
+        vocabulary = corpus.Vocabulary()
         for key, value in names_santances_dict.items():
             item = [key]
-            seq_name_dict = utils.generate_all_search_seq_from_sentences_list(value, self.n)
+            seq_name_dict = utils.generate_all_search_seq_from_sentences_list(value, vocabulary, self.n)
             seq_list = []
-            for name in seq_name_dict.keys():
-                name = name.split(' ')
-                seq_list.append(name)
+            for seq_ids in seq_name_dict.keys():
+                seq_list.append(vocabulary.decode(seq_ids))
 
             seq_list.sort()
-            item.append(seq_list)
-            res.append(item)
-
-        return res
+            item.append(seq_list if table is None else [table.add(seq) for seq in seq_list])
+            yield item
 
     def print_in_json(self):
         """
@@ -315,7 +364,8 @@ class PersonContextAnalyzer:
         :return:
         """
         dict_of_seq = utils.check_names_in_sentences(self.sentence_list, self.names_list)
-        res_dict = self.get_sentences_with_search_names(dict_of_seq)
+        table = output.SentenceTable() if self.sentence_ids else None
+        res_dict = self.get_sentences_with_search_names(dict_of_seq, table)
         if self.n == 0:
             data = {"Question 5": {
                 'Person Contexts and K-Seqs': []
@@ -324,8 +374,10 @@ class PersonContextAnalyzer:
             data = {"Question 5": {
                 'Person Contexts and K-Seqs': res_dict
             }}
+        if table is not None:
+            data["Question 5"]['K-Seqs'] = table.sentences()
 
-        print(json.dumps(data, indent=4))
+        output.print_json(data)
 
 
 
@@ -361,9 +413,12 @@ class PeopleDirectConnectionGraph:
     def __init__(self, args: argparse.Namespace) -> None:
         self.sentence_list = None
         self.names_list = None
+        self.count_pairs_in_w_dict = None
         validation.validate_args_DirectConnection(args)
         self.k = args.windowsize
         self.t = args.threshold
+        self.engine = args.engine if args.engine is not None else "python"
+        self.filename_save_graph = args.save_graph
         self.filename_remove_names = args.remove_words
         self.filename_sentences = args.sentences
         self.filename_names = args.names
@@ -371,9 +426,10 @@ class PeopleDirectConnectionGraph:
 
     def run(self):
         if self.filename_sentences:
-            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names)
-            self.sentence_list = all_sentences.generate_clean_sentences_list()
-            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names)
+            pipeline = Text_Cleaner.CleanerPipeline.from_csv(self.filename_remove_names)
+            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names, pipeline)
+            self.sentence_list = all_sentences
+            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names, pipeline)
             self.names_list = clean_names_list.generate_clean_names_list()
 
         elif self.filename_preprocessed:
@@ -381,59 +437,35 @@ class PeopleDirectConnectionGraph:
             self.sentence_list = clean_sentence_and_names[0]
             self.names_list = clean_sentence_and_names[1]
 
+        if self.filename_save_graph:
+            self.count_pairs_in_w_dict = self.check_names_in_sentence(self.sentence_list, self.k)
+            graph.CSRGraph.from_counts(self.count_pairs_in_w_dict, self.t).write(self.filename_save_graph)
+
     def check_names_in_sentence(self, sentences_list: list[list[str]], k: int) -> dict[tuple[str, str], int]:
         """
-        this func checks if there is a mention of a pair of names in a window - k of sentences
+        this func checks if there is a mention of a pair of names in a window - k of sentences.
         :return:
         """
-        count_mention_dict = {}
-        pairs_list = utils.all_possible_pairs_list(self.names_list)
-
-        if k > len(sentences_list):
-            print('invalid input')
+        try:
+            return utils.count_pair_windows(sentences_list, self.names_list, k, self.engine)
+        except ValueError:
+            print("invalid input")
             sys.exit(1)
 
-        for i in range(len(sentences_list) - k + 1):
-            window_sentences = sentences_list[i:i + k]
-
-            for pair in pairs_list:
-                name1, name2 = pair[0], pair[1]
-
-                name1_found = False
-                name2_found = False
-
-                for sentence in window_sentences:
-                    for full_name_1 in name1:
-                        for main_name_1 in full_name_1:
-                            if main_name_1 in sentence:
-                                name1_found = True
-
-                    for full_name_2 in name2:
-                        for main_name_2 in full_name_2:
-                            if main_name_2 in sentence:
-                                name2_found = True
-
-                if name1_found and name2_found:
-                    name1_string = ' '.join(name1[0])
-                    name2_string = ' '.join(name2[0])
-                    pair_key = (name1_string, name2_string)
-                    count_mention_dict[pair_key] = count_mention_dict.get(pair_key, 0) + 1
-
-        return count_mention_dict
-
-
     def print_in_json(self):
         """
         this func runs task 6
         :return:
         """
-        count_pairs_in_w_dict = self.check_names_in_sentence(self.sentence_list, self.k)
+        count_pairs_in_w_dict = self.count_pairs_in_w_dict
+        if count_pairs_in_w_dict is None:
+            count_pairs_in_w_dict = self.check_names_in_sentence(self.sentence_list, self.k)
         pairs_list = utils.check_move_edges(count_pairs_in_w_dict, self.t)
         data = {"Question 6": {
             'Pair Matches': utils.sort_pairs_list(pairs_list)
         }}
 
-        print(json.dumps(data, indent=4))
+        output.print_json(data)
 
 
 
@@ -462,6 +494,8 @@ class IndirectConnection:
     def __init__(self, args: argparse.Namespace):
         self.names_list = None
         self.graph = None
+        self.connections_graph = None
+        self.reachability = None
         self.sentence_list = None
         validation.validate_args_IndirectConnection(args)
         self.filename_remove_names = args.remove_words
@@ -479,9 +513,10 @@ class IndirectConnection:
 
     def run(self):
         if self.filename_sentences:
-            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names)
+            pipeline = Text_Cleaner.CleanerPipeline.from_csv(self.filename_remove_names)
+            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names, pipeline)
             self.sentence_list = all_sentences.generate_clean_sentences_list()
-            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names)
+            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names, pipeline)
             self.names_list = clean_names_list.generate_clean_names_list()
             self.graph = PeopleDirectConnectionGraph(self.args)
             self.graph.run()
@@ -520,81 +555,58 @@ class IndirectConnection:
 
         return data["keys"]
 
-    def build_graph(self) -> dict[str, list]:
+    def build_graph(self) -> graph.CSRGraph:
         """
         this func builds a graph according to the pairs in the people_connections_filename
-        :return: dict[str, list]
+        :return: graph.CSRGraph
         """
         neighbors_graph: defaultdict[str, set[str]] = defaultdict(set)
 
         if self.graph:
             count_mentions: dict[tuple[str, str], int] = self.graph.check_names_in_sentence(self.sentence_list, self.k)
-            for (name1, name2), count in count_mentions.items():
-                if count >= self.t:
-                    neighbors_graph[name1].add(name2)
-                    neighbors_graph[name2].add(name1)
-        else:
-            pairs = self.open_json_into_list_task6() if (
-                    "Pair Matches" in self.connection_names_list) else self.open_json_into_list_people_connection()
-            for pair in pairs:
-                name1, name2 = pair[0], pair[1]
-                neighbors_graph[name1].add(name2)
-                neighbors_graph[name2].add(name1)
+            return graph.CSRGraph.from_counts(count_mentions, self.t)
+
+        pairs = self.open_json_into_list_task6() if (
+                "Pair Matches" in self.connection_names_list) else self.open_json_into_list_people_connection()
+        for pair in pairs:
+            name1, name2 = pair[0], pair[1]
+            neighbors_graph[name1].add(name2)
+            neighbors_graph[name2].add(name1)
+
+        return graph.CSRGraph.from_adjacency(neighbors_graph)
+
+    def get_graph(self) -> graph.CSRGraph:
+        """
+        this func returns the graph of the connections, with int person ids. it is built on the first
+        call and reused by all the pairs; a graph file written by task 6 is memory-mapped instead
+        :return: graph.CSRGraph
+        """
+        if self.connections_graph is not None:
+            return self.connections_graph
 
-        return neighbors_graph
+        if self.graph:
+            self.connections_graph = self.build_graph()
+        elif self.sentence_list.endswith(graph.GRAPH_EXTENSION):
+            self.connections_graph = utils.load_people_graph(self.sentence_list)
+        else:
+            self.connections_graph = graph.CSRGraph.from_adjacency(
+                utils.graph_from_task6_pairs(self.open_json_into_list_task6()))
+        return self.connections_graph
 
     def check_remote_connection_pairs(self, name1, name2) -> bool:
         """
-        this func checks if two names has a remote connection until max distance is reached
+        this func checks if two names has a remote connection until max distance is reached.
+        the components of the graph are labelled once, and the bfs of every source is cached
         :param name1:
         :param name2:
         :return:bool
         """
-        if self.graph:
-            new_graph = self.build_graph()
-
-        else:
-            pairs = self.open_json_into_list_task6()
-            flattened_lists = []
-            for pair in pairs:
-                flattened_pairs = [[' '.join(sublist)] for sublist in pair]
-                flattened_lists.append(flattened_pairs)
-
-            new_graph = {}
-
-            for pair in flattened_lists:
-                pair1, pair2 = pair[0][0], pair[1][0]
-
-                if pair1 not in new_graph:
-                    new_graph[pair1] = []
-                if pair2 not in new_graph:
-                    new_graph[pair2] = []
+        people_graph = self.get_graph()
+        if self.reachability is None:
+            self.reachability = graph.ReachabilityIndex(people_graph)
 
-                new_graph[pair1].append(pair2)
-                new_graph[pair2].append(pair1)
-
-        if name1 not in new_graph or name2 not in new_graph:
-            return False
-
-        if new_graph == {}:
-            return False
-
-        inital_name = deque([(name1, 0)])
-        visited = set()
-
-        while inital_name:
-            current, distance = inital_name.popleft()
-
-            if current == name2:
-                return True
-
-            if distance < self.max_dist:
-                for neighbor in new_graph[current]:
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        inital_name.append((neighbor, distance + 1))
-
-        return False
+        return self.reachability.is_connected_within(people_graph.node(name1), people_graph.node(name2),
+                                                     self.max_dist)
 
     def print_in_json(self):
         """
@@ -610,14 +622,10 @@ class IndirectConnection:
             for name1, name2 in self.open_json_into_list_people_connection():
                 res.append([name1, name2, self.check_remote_connection_pairs(name1, name2)])
 
-        for item in res:
-            item[:2] = sorted(item[:2])
-        sorted_res = sorted(res, key=lambda x: (x[0], x[1]))
-
-        data = {"Question 7": sorted_res,
+        data = {"Question 7": utils.sort_connection_results(res),
                 }
 
-        print(json.dumps(data, indent=4))
+        output.print_json(data)
 
 
 class FixedLengthPathChecker:
@@ -662,6 +670,8 @@ class FixedLengthPathChecker:
         self.args = args
         args.fixed_length = None
         self.graph = None
+        self.connections_graph = None
+        self.path_finder = None
         del self.args.pairs
         if self.filename_sentences:
             self.k = args.windowsize
@@ -669,9 +679,10 @@ class FixedLengthPathChecker:
 
     def run(self):
         if self.filename_sentences:
-            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names)
+            pipeline = Text_Cleaner.CleanerPipeline.from_csv(self.filename_remove_names)
+            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names, pipeline)
             self.sentence_list = all_sentences.generate_clean_sentences_list()
-            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names)
+            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names, pipeline)
             self.names_list = clean_names_list.generate_clean_names_list()
             self.graph = PeopleDirectConnectionGraph(self.args)
             self.graph.run()
@@ -707,87 +718,58 @@ class FixedLengthPathChecker:
 
         return data["keys"]
 
-    def build_graph(self) -> dict[str, list[str]]:
+    def build_graph(self) -> graph.CSRGraph:
         """
         Builds a graph according to the pairs in the people_connections_filename.
-        :return: dict[str, list]
+        :return: graph.CSRGraph
         """
-        neighbors_graph: defaultdict[str, set[str]] = defaultdict(set)
         count_mentions: dict[tuple[str, str], int] = self.graph.check_names_in_sentence(self.sentence_list, self.k)
-        for (name1, name2), count in count_mentions.items():
-            if count >= self.t:
-                neighbors_graph[name1].add(name2)
-                neighbors_graph[name2].add(name1)
+        return graph.CSRGraph.from_counts(count_mentions, self.t)
 
-        return neighbors_graph
-
-    def check_fixed_path_connection(self, name1: str, name2: str) -> bool:
+    def get_graph(self) -> graph.CSRGraph:
         """
-        This function checks if two names are connected by a fixed-length path (no loops allowed).
-        :param name1: First name
-        :param name2: Second name
-        :return: True if they are connected by a path of length self.path_length, otherwise False.
+        this func returns the graph of the connections, with int person ids. it is built on the first
+        call and reused by all the pairs; a graph file written by task 6 is memory-mapped instead
+        :return: graph.CSRGraph
         """
-        if self.graph:
-            new_graph = self.build_graph()
-
-        else:
-            pairs = self.open_json_into_list_task6()
-            flattened_lists = []
-            for pair in pairs:
-                flattened_pairs = [[' '.join(sublist)] for sublist in pair]
-                flattened_lists.append(flattened_pairs)
-
-            new_graph = {}
-
-            for pair in flattened_lists:
-                pair1, pair2 = pair[0][0], pair[1][0]
-
-                if pair1 not in new_graph:
-                    new_graph[pair1] = []
-                if pair2 not in new_graph:
-                    new_graph[pair2] = []
-
-                new_graph[pair1].append(pair2)
-                new_graph[pair2].append(pair1)
-
-        if name1 not in new_graph or name2 not in new_graph:
-            return False
-
-        inital_name = deque([(name1, [name1])])
-        visited = set()
-
-        while inital_name:
-            current, path = inital_name.popleft()
-
-            if current == name2 and len(path) == self.fixed_length:
-                return True
-
-            if current not in visited:
-                visited.add(current)
+        if self.connections_graph is None:
+            if self.graph:
+                self.connections_graph = self.build_graph()
+            elif self.sentence_list.endswith(graph.GRAPH_EXTENSION):
+                self.connections_graph = utils.load_people_graph(self.sentence_list)
+            else:
+                self.connections_graph = graph.CSRGraph.from_adjacency(
+                    utils.graph_from_task6_pairs(self.open_json_into_list_task6()))
+        return self.connections_graph
 
-                for neighbor in new_graph[current]:
-                    if neighbor not in path:
-                        inital_name.append((neighbor, path + [neighbor]))
+    def check_fixed_path_connections(self, pairs: list[list[str]]) -> list[bool]:
+        """
+        This function checks, for every pair of names, if they are connected by a fixed-length path
+        (no loops allowed). The length of a path is the number of names on it.
+        The pairs are grouped by their first name, and one search per first name answers all its pairs.
+        :param pairs: [name1, name2] pairs
+        :return: for every pair, True if they are connected by a path of length self.fixed_length.
+        """
+        people_graph = self.get_graph()
+        if self.path_finder is None:
+            self.path_finder = graph.SimplePathFinder(people_graph)
 
-        return False
+        node_pairs = [[people_graph.node(name1), people_graph.node(name2)] for name1, name2 in pairs]
+        return utils.check_pairs_by_source(self.path_finder, node_pairs, self.fixed_length)
 
     def print_in_json(self):
         """
         This function runs task 8 and prints the results in JSON format.
         :return:
         """
+        pairs = self.open_json_into_list()
         res = []
-        for name1, name2 in self.open_json_into_list():
-            res.append([name1, name2, self.check_fixed_path_connection(name1, name2)])
+        for (name1, name2), connected in zip(pairs, self.check_fixed_path_connections(pairs)):
+            res.append([name1, name2, connected])
 
-        for item in res:
-            item[:2] = sorted(item[:2])
-        sorted_res = sorted(res, key=lambda x: (x[0], x[1]))
+        data = {"Question 8": utils.sort_connection_results(res), }
 
-        data = {"Question 8": sorted_res, }
-
-        print(json.dumps(data, indent=4))
+        output.print_json(data)
 
 
 class SentenceClustering:
@@ -823,11 +805,17 @@ class SentenceClustering:
         self.sentence_list = None
         validation.validate_args_SentenceClustering(args)
         self.t = args.threshold
+        self.thresholds = clustering.parse_thresholds(args.thresholds) if args.thresholds is not None else None
+        self.dendrogram = args.dendrogram
+        self.engine = args.engine if args.engine is not None else "python"
+        self.recall_report = None
+        self.linkage = None
+        self.sentence_ids = args.sentence_ids
         self.filename_remove_names = args.remove_words
         self.filename_sentences = args.sentences
         self.filename_names = args.names
         self.filename_preprocessed = args.preprocessed
-        self.graph = None
+        self.components = None
 
     def run(self):
         if self.filename_sentences:
@@ -838,72 +826,159 @@ class SentenceClustering:
             clean_sentence_and_names = utils.task1_into_lists(self.filename_preprocessed)
             self.sentence_list = clean_sentence_and_names[0]
 
-        self.graph = self.build_graph()
+        if self.thresholds is not None or self.dendrogram:
+            self.linkage = self.build_linkage()
+        else:
+            self.components = self.build_graph()
 
-    def build_graph(self) -> dict[int, list[int]]:
+    def build_graph(self) -> clustering.UnionFind:
         """
-        this func builds a graph, if two sentences have more then t number of common words then
-        the index number of ine of them is added as key and the index number of the second is
-        added as value.
-        :return:dict[int:list[int]]
+        this func connects every two sentences that have at least t common distinct words. the pairs
+        are found from the sentences of every word (an inverted index) instead of comparing all the
+        pairs, and they are merged straight into a union-find of the sentence indexes.
+        with the minhash engine only the pairs of the same lsh buckets are checked, and the recall
+        of the groups is measured against the exact pairs of a sample of sentences. the sparse
+        engine counts the shared words with blocked sparse matrix products instead.
+        :return: clustering.UnionFind
         """
-        graph: dict[int, list[int]] = {}
-        for i in range(len(self.sentence_list)):
-            for j in range(i + 1, len(self.sentence_list)):
-                common_words = set(self.sentence_list[i]) & set(self.sentence_list[j])
+        encoded_sentences = corpus.encode_sentences(self.sentence_list)
+        if self.engine == "sparse":
+            return clustering.sparse_shared_word_groups(encoded_sentences, self.t)
 
-                if len(common_words) >= self.t:
-                    if i not in graph:
-                        graph[i] = []
-                    if j not in graph:
-                        graph[j] = []
+        shared_words = clustering.SharedWordIndex(encoded_sentences)
+        if self.engine == "minhash":
+            components = clustering.MinHashLSH().cluster(shared_words, self.t)
+            self.recall_report = clustering.recall_report(shared_words, components, self.t)
+            return components
 
-                    graph[i].append(j)
-                    graph[j].append(i)
+        return shared_words.cluster(self.t)
 
-        return graph
+    def build_linkage(self) -> clustering.SingleLinkage:
+        """
+        this func counts the common words of the pairs once for all the thresholds: the pairs with
+        at least the smallest threshold, or with at least one common word for the dendrogram
+        :return: clustering.SingleLinkage
+        """
+        encoded_sentences = corpus.encode_sentences(self.sentence_list)
+        min_t = min(self.thresholds) if self.thresholds is not None else 1
+        return clustering.SingleLinkage(clustering.SharedWordIndex(encoded_sentences), min_t)
 
-    def find_groups(self) -> list[list[str]]:
+    def find_groups(self, groups_ids: list[list[int]] | None = None) -> list[list[str]]:
         """
-        Finds and returns all groups of connected sentences in the graph.
+        Finds and returns all groups of connected sentences in the graph, or the sentences of the
+        given groups of sentence indexes.
         """
-        visited = set()
-        groups: list[list[str]] = []
+        if groups_ids is None:
+            groups_ids = self.components.groups()
 
-        def dfs(node_g: str, group_g: list[str]) -> None:
-            """Performs Depth-First Search to find all connected components."""
-            visited.add(node_g)
-            group_g.append(node_g)
-            for neighbor in self.graph.get(node_g, []):
-                if neighbor not in visited:
-                    dfs(neighbor, group_g)
-
-        for node in range(len(self.sentence_list)):
-            if node not in visited:
-                group: list[str] = []
-                dfs(node, group)
-                in_list = []
-                for index in group:
-                    in_list.append(self.sentence_list[int(index)])
-                groups.append(in_list)
+        groups: list[list[str]] = []
+        for group in groups_ids:
+            groups.append([self.sentence_list[sentence_id] for sentence_id in group])
 
         return groups
 
-
-    def print_in_json(self):
+    def group_matches(self, groups_ids: list[list[int]] | None = None,
+                      table: output.SentenceTable | None = None) -> list[list]:
         """
-        this func runs task 9
-        :return:
+        this func numbers the sorted groups of sentences. with a table the sentences are replaced
+        by their ids in the table
+        :return: [[Group 1, sentences], ...]
         """
         return_list = []
-        groups_list = self.find_groups()
+        groups_list = self.find_groups(groups_ids)
         sorted_groups_list = utils.sort_groups(groups_list)
         for i, group in enumerate(sorted_groups_list, 1):
+            if table is not None:
+                group = [table.add(sentence) for sentence in group]
             return_list.append([f'Group {i}', group])
 
-        data = {"Question 9": {
-            "group Matches": return_list,
+        return return_list
 
-        }}
+    def print_in_json(self):
+        """
+        this func runs task 9
+        :return:
+        """
+        # the dendrogram references its sentences by index already
+        table = output.SentenceTable() if self.sentence_ids and not self.dendrogram else None
+        if self.thresholds is not None:
+            groups_by_threshold = self.linkage.groups_at(self.thresholds)
+            data = {"Question 9": {
+                "Threshold Matches": [[f'Threshold {t}', self.group_matches(groups_by_threshold[t], table)]
+                                      for t in sorted(groups_by_threshold)],
+            }}
+        elif self.dendrogram:
+            data = {"Question 9": {
+                "Sentences": [self.sentence_list[i] for i in range(len(self.sentence_list))],
+                "Dendrogram": self.linkage.dendrogram(),
+            }}
+        else:
+            data = {"Question 9": {
+                "group Matches": self.group_matches(table=table),
+
+            }}
+        if table is not None:
+            data["Question 9"]["Sentences"] = table.sentences()
+        if self.recall_report is not None:
+            data["Recall Report"] = self.recall_report
+
+        output.print_json(data)
+
+
+class LocalQueryServer:
+    """
+    This class runs a long-running local server that answers the queries of tasks 4, 7 and 8.
+
+    Given:
+        - A list of sentences (CSV with the remove-words file, or a Task 1 preprocessed file).
+        - A People file, or the names of the Task 1 preprocessed file.
+        - Window size k and threshold t of the people graph (as in Task 6).
+        - An address: "HOST:PORT" on localhost or "unix:PATH".
+
+    The corpus is cleaned once and the k-seq index and the people graph are built once. The server
+    then answers k-seq, indirect-connection and fixed-length-path queries until it is stopped,
+    in the "Question 4/7/8" JSON formats, without re-running the cleaning or rebuilding anything.
 
-        print(json.dumps(data, indent=4))
+    Use Case:
+        Running many queries against the same corpus with a latency of milliseconds.
+
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        self.sentence_list = None
+        self.names_list = None
+        validation.validate_args_LocalQueryServer(args)
+        self.filename_remove_names = args.remove_words
+        self.filename_sentences = args.sentences
+        self.filename_names = args.names
+        self.filename_preprocessed = args.preprocessed
+        self.k = args.windowsize
+        self.t = args.threshold
+        self.address = args.serve
+        self.query_server = None
+
+    def run(self):
+        if self.filename_sentences:
+            pipeline = Text_Cleaner.CleanerPipeline.from_csv(self.filename_remove_names)
+            all_sentences = Text_Cleaner.CleanSentences(self.filename_sentences, self.filename_remove_names, pipeline)
+            self.sentence_list = all_sentences.generate_clean_sentences_list()
+            clean_names_list = Text_Cleaner.CleanNames(self.filename_names, self.filename_remove_names, pipeline)
+            self.names_list = clean_names_list.generate_clean_names_list()
+
+        elif self.filename_preprocessed:
+            clean_sentence_and_names = utils.task1_into_lists(self.filename_preprocessed)
+            self.sentence_list = clean_sentence_and_names[0]
+            self.names_list = clean_sentence_and_names[1]
+
+        try:
+            self.query_server = server.QueryServer(self.sentence_list, self.names_list, self.k, self.t)
+        except ValueError:
+            print("invalid input")
+            sys.exit(1)
+
+    def print_in_json(self):
+        """
+        this func runs task 10: the answers are written to the clients instead of printed
+        :return:
+        """
+        self.query_server.serve_forever(self.address)
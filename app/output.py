@@ -0,0 +1,199 @@
+"""
+This module writes the JSON documents printed by the tasks.
+
+A document is written piece by piece, as its results are produced, instead of being encoded into
+one string first: dicts, lists of lists and iterators are streamed item by item, and only their
+smallest parts (lists of words, numbers, strings) are encoded at once, with the string encoder of
+the json module. The text is the same as print(json.dumps(data, indent=4)), or as
+json.dumps(data, separators=(',', ':')) with --compact, so an iterator in the data is written
+exactly like the list it yields.
+
+With --sentence_ids the results of tasks 4, 5 and 9 reference their sentences (the k-seqs in
+task 5) by integer ids, and every distinct sentence is written once, in a table after the results.
+
+Classes:
+    - OutputOptions: The output file and format of the current run.
+    - SentenceTable: Numbers the distinct sentences referenced by a result.
+
+Functions:
+    - iter_json: Yields the JSON text of a value in pieces.
+    - write_json: Writes a value as JSON into a text file.
+    - print_json: Writes a task result where the command line asked for it.
+"""
+
+# Import python library:
+import json
+import json.encoder
+import os
+import sys
+import tempfile
+from collections.abc import Iterator
+from typing import TextIO
+
+OUTPUT_EXTENSION = ".json"
+
+_INDENT = '    '
+_SCALARS = (str, int, float, bool, type(None))
+# The pieces are written to the file in chunks of about this many characters.
+_CHUNK_SIZE = 1 << 16
+
+
+class OutputOptions:
+    """
+    Where and how print_json writes the result of the task.
+
+    Attributes:
+        path (str | None): The file to write into, or None for the standard output.
+        compact (bool): True to drop the indentation and the spaces after the separators.
+    """
+
+    def __init__(self, path: str | None = None, compact: bool = False):
+        self.path = path
+        self.compact = compact
+
+
+# The options of the current run, set by the interface from the command line.
+options = OutputOptions()
+
+
+def configure(path: str | None, compact: bool) -> None:
+    """
+    Sets the output file and format used by print_json.
+    """
+    options.path = path
+    options.compact = bool(compact)
+
+
+class SentenceTable:
+    """
+    Numbers the distinct sentences of a result in the order they are first referenced, so a
+    sentence matched many times is written once, in the table, and then only by its id.
+
+    Attributes:
+        ids (dict[tuple[str, ...], int]): The id of every sentence, as a tuple of words.
+    """
+
+    def __init__(self):
+        self.ids: dict[tuple[str, ...], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, sentence: list[str] | tuple[str, ...]) -> int:
+        """
+        Returns the id of a sentence, numbering it if it was not referenced before.
+        """
+        key = tuple(sentence)
+        sentence_id = self.ids.get(key)
+        if sentence_id is None:
+            sentence_id = self.ids[key] = len(self.ids)
+        return sentence_id
+
+    def sentences(self) -> Iterator[tuple[str, ...]]:
+        """
+        Yields the sentences by id. It is read while the table is written, after the results
+        that number the sentences, so the table can be put in the data before they are produced.
+        """
+        yield from self.ids
+
+
+def _scalar(value) -> str:
+    """
+    Returns the JSON text of a scalar; strings and ints, the most common ones, skip the json.dumps call.
+    """
+    if type(value) is str:
+        return json.encoder.encode_basestring_ascii(value)
+    if type(value) is int:
+        return int.__repr__(value)
+    return json.dumps(value)
+
+
+def _key(key) -> str:
+    """
+    Returns a dict key as json writes it: a string, or the JSON text of a scalar.
+    """
+    return key if isinstance(key, str) else json.dumps(key)
+
+
+def iter_json(value, compact: bool = False, level: int = 0) -> Iterator[str]:
+    """
+    Yields the JSON text of a value in pieces. Lists and tuples of scalars are encoded at once;
+    dicts, the other lists and tuples, and any other iterable are written item by item.
+    :param value: the value to encode
+    :param compact: True for the separators (',', ':') without indentation, False for indent=4
+    :param level: the indentation level of the value
+    """
+    if isinstance(value, _SCALARS):
+        yield _scalar(value)
+        return
+
+    if isinstance(value, (list, tuple)) and all(isinstance(item, _SCALARS) for item in value):
+        if not value:
+            yield '[]'
+        elif compact:
+            yield '[' + ','.join(map(_scalar, value)) + ']'
+        else:
+            yield ('[\n' + _INDENT * (level + 1) + (',\n' + _INDENT * (level + 1)).join(map(_scalar, value))
+                   + '\n' + _INDENT * level + ']')
+        return
+
+    item_separator = ',' if compact else ',\n' + _INDENT * (level + 1)
+    if isinstance(value, dict):
+        opening, closing = '{', '}'
+        key_separator = ':' if compact else ': '
+        items = ((_scalar(_key(key)) + key_separator, item) for key, item in value.items())
+    else:
+        opening, closing = '[', ']'
+        items = (('', item) for item in value)
+
+    empty = True
+    for prefix, item in items:
+        if empty:
+            yield opening + ('' if compact else '\n' + _INDENT * (level + 1)) + prefix
+            empty = False
+        else:
+            yield item_separator + prefix
+        yield from iter_json(item, compact, level + 1)
+
+    if empty:
+        yield opening + closing
+    else:
+        yield ('' if compact else '\n' + _INDENT * level) + closing
+
+
+def write_json(value, file: TextIO, compact: bool = False) -> None:
+    """
+    Writes a value as JSON into a text file, followed by a newline as print() would.
+    """
+    chunk = []
+    size = 0
+    for piece in iter_json(value, compact):
+        chunk.append(piece)
+        size += len(piece)
+        if size >= _CHUNK_SIZE:
+            file.write(''.join(chunk))
+            chunk.clear()
+            size = 0
+    chunk.append('\n')
+    file.write(''.join(chunk))
+
+
+def print_json(data) -> None:
+    """
+    Writes the result of a task into the output file of the run, or to the standard output.
+    The file is written under a temporary name in the same directory and renamed when complete,
+    so a run that stops midway leaves no truncated output.
+    """
+    if options.path is None:
+        write_json(data, sys.stdout, options.compact)
+        return
+
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(options.path)),
+                                                  prefix=os.path.basename(options.path) + '.', suffix='.tmp')
+    try:
+        with open(descriptor, 'w', encoding='utf-8') as file:
+            write_json(data, file, options.compact)
+        os.replace(temporary_path, options.path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
@@ -0,0 +1,322 @@
+"""
+This module implements the k-seq counting engines used by Task 2.
+
+Classes:
+    - NGramCounter: Counts every k-seq for all 1 <= k <= N in a single pass over the sentences.
+    - CountMinSketch: A fixed-size sketch whose estimates are never below the true counts.
+    - SpaceSaving: Keeps a bounded number of counters for the most frequent keys.
+    - PrunedNGramCounter: Returns only the top K k-seqs and/or those seen at least C times,
+                          in bounded memory, with exact counts.
+"""
+
+# Import python library:
+import heapq
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+
+# Import project files:
+from . import corpus
+
+
+class NGramCounter:
+    """
+    Counts the k-seqs of all lengths 1 <= k <= N in one sweep of the corpus.
+
+    Each sentence is encoded once into word ids, and every k-seq starting at a position is
+    counted as a tuple of ids, so the sentences are read a single time no matter how large N is.
+    The keys are joined into strings and sorted only once, when the result is built.
+
+    Attributes:
+        n (int): The maximal k-seq length.
+        vocabulary (corpus.Vocabulary): The word ids of the counted sentences.
+        counts (dict[tuple[int, ...], int]): The count of every k-seq, for all k together.
+    """
+
+    def __init__(self, n: int, vocabulary: corpus.Vocabulary | None = None):
+        self.n = n
+        self.vocabulary = vocabulary if vocabulary is not None else corpus.Vocabulary()
+        self.counts: dict[tuple[int, ...], int] = {}
+
+    def add_ids(self, sentence_ids: Sequence[int]) -> None:
+        """
+        Counts all the k-seqs of one encoded sentence.
+        """
+        ids = tuple(sentence_ids)
+        counts = self.counts
+        length = len(ids)
+        for start in range(length):
+            for end in range(start + 1, min(start + self.n, length) + 1):
+                seq_ids = ids[start:end]
+                counts[seq_ids] = counts.get(seq_ids, 0) + 1
+
+    def count(self, sentences: Iterable[list[str]]) -> 'NGramCounter':
+        """
+        Counts all the k-seqs of the given sentences in a single pass.
+        A mapped corpus file is counted from its stored word ids, without decoding it.
+        """
+        if isinstance(sentences, corpus.MappedCorpus) and not self.counts:
+            self.vocabulary = sentences.vocabulary
+            for i in range(len(sentences)):
+                self.add_ids(sentences.sentence_ids(i))
+            return self
+
+        for sentence in sentences:
+            self.add_ids(self.vocabulary.encode(sentence))
+        return self
+
+    def to_list(self) -> list[list]:
+        """
+        Returns the counts in the Task 2 format: one [f'{k}_seq', [[seq, count], ...]] item for every k,
+        with the seqs of each k in lexicographic order.
+        """
+        tokens = self.vocabulary.tokens
+        words_dicts: list[dict[str, int]] = [{} for _ in range(self.n)]
+        for seq_ids, count in self.counts.items():
+            words_dicts[len(seq_ids) - 1][' '.join([tokens[token_id] for token_id in seq_ids])] = count
+
+        final_list = []
+        for k, words_dict in enumerate(words_dicts, 1):
+            final_list.append([f'{k}_seq', [[seq, words_dict[seq]] for seq in sorted(words_dict)]])
+        return final_list
+
+
+def iter_kseqs(sentence_ids: Sequence[int], n: int) -> Iterator[tuple[int, ...]]:
+    """
+    Yields every k-seq of an encoded sentence, for all 1 <= k <= n.
+    """
+    ids = tuple(sentence_ids)
+    length = len(ids)
+    for start in range(length):
+        for end in range(start + 1, min(start + n, length) + 1):
+            yield ids[start:end]
+
+
+class CountMinSketch:
+    """
+    A count-min sketch: depth rows of width counters. Every key adds 1 to one counter per row,
+    and its estimate is the smallest of those counters, which is never below its true count.
+
+    Attributes:
+        width (int): Counters per row.
+        depth (int): Number of rows.
+    """
+
+    def __init__(self, width: int = 1 << 20, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = [array('I', bytes(4 * width)) for _ in range(depth)]
+
+    def add(self, key: tuple[int, ...]) -> None:
+        key_hash = hash(key) & 0xFFFFFFFFFFFFFFFF
+        position = key_hash & 0xFFFFFFFF
+        step = (key_hash >> 32) | 1
+        width = self.width
+        for row in self.table:
+            index = position % width
+            if row[index] < 0xFFFFFFFF:
+                row[index] += 1
+            position += step
+
+    def estimate(self, key: tuple[int, ...]) -> int:
+        key_hash = hash(key) & 0xFFFFFFFFFFFFFFFF
+        position = key_hash & 0xFFFFFFFF
+        step = (key_hash >> 32) | 1
+        width = self.width
+        estimate = 0xFFFFFFFF
+        for row in self.table:
+            count = row[position % width]
+            if count < estimate:
+                estimate = count
+            position += step
+        return estimate
+
+
+class SpaceSaving:
+    """
+    The space-saving algorithm: at most capacity keys are monitored. A new key that arrives when
+    the table is full replaces the key with the smallest counter and takes over its count.
+    A key that is not monitored at the end was seen at most min_count() times.
+
+    Attributes:
+        capacity (int): The maximal number of monitored keys.
+        counts (dict[tuple[int, ...], int]): The (over-estimated) counter of each monitored key.
+        evicted (bool): Whether a key was ever replaced; if not, all the counters are exact.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: dict[tuple[int, ...], int] = {}
+        self.evicted = False
+        self._heap: list[tuple[int, tuple[int, ...]]] = []
+
+    def _pop_min(self) -> tuple[int, tuple[int, ...]]:
+        """
+        Pops the monitored key with the smallest counter, skipping outdated heap entries.
+        """
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return count, key
+
+    def add(self, key: tuple[int, ...]) -> None:
+        counts = self.counts
+        if key in counts:
+            counts[key] += 1
+        elif len(counts) < self.capacity:
+            counts[key] = 1
+        else:
+            min_count, min_key = self._pop_min()
+            del counts[min_key]
+            counts[key] = min_count + 1
+            self.evicted = True
+
+        heapq.heappush(self._heap, (counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, seq_ids) for seq_ids, count in counts.items()]
+            heapq.heapify(self._heap)
+
+    def min_count(self) -> int:
+        """
+        Returns an upper bound on the count of every key that is not monitored.
+        """
+        if not self.evicted:
+            return 0
+        return min(self.counts.values())
+
+
+class PrunedNGramCounter:
+    """
+    Counts k-seqs for all 1 <= k <= N but keeps only the head of the distribution:
+    the top K seqs of each k (by count, ties in lexicographic order) and/or the seqs
+    that appear at least C times.
+
+    The sentences are read twice, and the memory is bounded by the sketches and the candidates.
+    The first pass feeds a count-min sketch and, for the top K, a space-saving table per k. The
+    second pass counts the candidates they propose exactly. A count-min estimate is never below
+    the true count, so no seq with at least C appearances is missed.
+
+    For the top K, the candidates are the seqs monitored by the space-saving table of their k.
+    A seq that is not monitored appeared at most SpaceSaving.min_count() times, and at most its
+    count-min estimate, which the second pass reads for every seq it does not count. Every seq
+    counted above the smaller of these bounds is therefore in its exact place, so the result is
+    exact when the K-th count of a k is above it. Otherwise only the seqs above the bound are
+    kept, the guaranteed-exact prefix of the top K, and the k is listed in truncated.
+
+    Attributes:
+        n (int): The maximal k-seq length.
+        top (int | None): How many seqs to keep for each k.
+        min_count (int | None): The minimal count of a kept seq.
+        vocabulary (corpus.Vocabulary): The word ids of the counted sentences.
+        counts (dict[tuple[int, ...], int]): The exact count of every kept seq.
+        truncated (list[int]): The k whose top K is only its guaranteed-exact prefix.
+    """
+
+    def __init__(self, n: int, top: int | None = None, min_count: int | None = None,
+                 capacity: int | None = None, sketch_width: int = 1 << 20, sketch_depth: int = 4):
+        self.n = n
+        self.top = top
+        self.min_count = min_count if min_count is not None else 0
+        self.capacity = capacity if capacity is not None else max(10 * (top or 0), 1000)
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.vocabulary = corpus.Vocabulary()
+        self.counts: dict[tuple[int, ...], int] = {}
+        self.truncated: list[int] = []
+
+    def _exact_counts(self, sentences: Iterable[list[str]], lengths: set[int]) -> dict[tuple[int, ...], int]:
+        """
+        Counts every k-seq whose length is in lengths, exactly.
+        """
+        counts = {}
+        for sentence_ids in corpus.iter_encoded_sentences(sentences, self.vocabulary):
+            for seq_ids in iter_kseqs(sentence_ids, max(lengths)):
+                if len(seq_ids) in lengths:
+                    counts[seq_ids] = counts.get(seq_ids, 0) + 1
+        return counts
+
+    def count(self, sentences: Iterable[list[str]]) -> 'PrunedNGramCounter':
+        """
+        Counts the kept k-seqs of the given sentences. sentences must be readable more than once
+        (a list, a mapped corpus file, or a CleanSentences stream).
+        """
+        self.vocabulary = corpus.vocabulary_for(sentences)
+        if self.n <= 0:
+            return self
+
+        use_sketch = self.min_count > 1 or self.top is not None
+        sketch = CountMinSketch(self.sketch_width, self.sketch_depth) if use_sketch else None
+        tables = [SpaceSaving(self.capacity) for _ in range(self.n)] if self.top is not None else None
+
+        if sketch is None and tables is None:
+            self.counts = self._exact_counts(sentences, set(range(1, self.n + 1)))
+            return self
+
+        for sentence_ids in corpus.iter_encoded_sentences(sentences, self.vocabulary):
+            for seq_ids in iter_kseqs(sentence_ids, self.n):
+                if sketch is not None:
+                    sketch.add(seq_ids)
+                if tables is not None:
+                    tables[len(seq_ids) - 1].add(seq_ids)
+
+        if tables is None:
+            candidates = None
+        else:
+            candidates = set()
+            for table in tables:
+                candidates.update(table.counts)
+            table_bounds = [table.min_count() for table in tables]
+
+        # the largest count-min estimate of a seq that is not a candidate, for every k; it is not
+        # read once it reaches the bound of the space-saving table
+        missing_estimates = [0] * self.n
+        exact = {}
+        for sentence_ids in corpus.iter_encoded_sentences(sentences, self.vocabulary):
+            for seq_ids in iter_kseqs(sentence_ids, self.n):
+                if candidates is not None:
+                    if seq_ids not in candidates:
+                        k = len(seq_ids)
+                        if missing_estimates[k - 1] < table_bounds[k - 1]:
+                            estimate = sketch.estimate(seq_ids)
+                            if estimate > missing_estimates[k - 1]:
+                                missing_estimates[k - 1] = estimate
+                        continue
+                elif seq_ids not in exact and sketch.estimate(seq_ids) < self.min_count:
+                    continue
+                exact[seq_ids] = exact.get(seq_ids, 0) + 1
+
+        self.counts = {seq_ids: count for seq_ids, count in exact.items() if count >= self.min_count}
+
+        if tables is not None:
+            for k, table in enumerate(tables, 1):
+                missing_bound = min(table_bounds[k - 1], missing_estimates[k - 1])
+                if missing_bound < max(self.min_count, 1):
+                    continue
+                kept = sorted((count for seq_ids, count in self.counts.items() if len(seq_ids) == k), reverse=True)
+                if len(kept) >= self.top and kept[self.top - 1] > missing_bound:
+                    continue
+
+                # a missing seq may rank among the seqs counted at most missing_bound times
+                self.counts = {seq_ids: count for seq_ids, count in self.counts.items()
+                               if len(seq_ids) != k or count > missing_bound}
+                self.truncated.append(k)
+
+        return self
+
+    def to_list(self) -> list[list]:
+        """
+        Returns the kept counts in the Task 2 format. With a top K, the seqs of each k are ordered by
+        count (highest first) and then lexicographically; otherwise only lexicographically.
+        """
+        tokens = self.vocabulary.tokens
+        words_dicts: list[dict[str, int]] = [{} for _ in range(self.n)]
+        for seq_ids, count in self.counts.items():
+            words_dicts[len(seq_ids) - 1][' '.join([tokens[token_id] for token_id in seq_ids])] = count
+
+        final_list = []
+        for k, words_dict in enumerate(words_dicts, 1):
+            if self.top is not None:
+                seqs = sorted(words_dict, key=lambda seq: (-words_dict[seq], seq))[:self.top]
+            else:
+                seqs = sorted(words_dict)
+            final_list.append([f'{k}_seq', [[seq, words_dict[seq]] for seq in seqs]])
+        return final_list
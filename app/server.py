@@ -0,0 +1,291 @@
+"""
+This module implements a long-running local query server over one corpus.
+
+The corpus is cleaned (or loaded) once, and the k-seq index and the people graph are built once
+and kept in memory. Queries are then answered over HTTP on a localhost TCP port or a Unix socket,
+with asyncio, so each of them costs a lookup instead of a whole run of main.py.
+
+Endpoints (POST, JSON body, JSON answer):
+    - /kseq:          {"keys": [...]}                                 -> {"Question 4": ...}
+    - /indirect:      {"keys": [[name1, name2], ...], "maximal_distance": d} -> {"Question 7": ...}
+    - /fixed_length:  {"keys": [[name1, name2], ...], "fixed_length": l}     -> {"Question 8": ...}
+
+The bodies use the same formats as the --qsek_query_path and --pairs files, and the answers have
+the same shapes as the outputs of tasks 4, 7 and 8.
+
+The queries are answered in worker threads, so a slow one (such as a long fixed-length path on a
+dense graph) does not hold the other connections. A query that takes longer than the timeout is
+answered with 503, and a body larger than the limit with 413.
+
+Classes:
+    - QueryServer: Holds the warm indexes and answers the queries.
+"""
+
+# Import python library:
+import asyncio
+import ipaddress
+import json
+from collections.abc import Callable
+
+# Import project files:
+from . import corpus
+from . import graph
+from . import index
+from . import utils
+
+UNIX_PREFIX = "unix:"
+
+# The longest a query is waited for, in seconds, and the largest request body accepted, in bytes.
+QUERY_TIMEOUT = 10.0
+MAX_BODY_BYTES = 1 << 20
+
+# How long the body of a refused request is read and dropped, so that closing the connection does
+# not reset it before the client reads the answer.
+DISCARD_SECONDS = 1.0
+
+
+class QueryError(ValueError):
+    """
+    Raised for a query that is not valid; it is answered with 400 and "invalid input".
+    """
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Checks if a host name or address only reaches this machine.
+    """
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip('[]')).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_address(address: str) -> tuple[str, str | int]:
+    """
+    Parses a --serve address: "unix:PATH" for a Unix socket, or "HOST:PORT" (or just "PORT") for TCP.
+    The corpus is served to the local machine only, so HOST must be a loopback address.
+    :return: ("unix", path) or (host, port)
+    :raises ValueError: if the address is not valid
+    """
+    if address.startswith(UNIX_PREFIX):
+        path = address[len(UNIX_PREFIX):]
+        if not path:
+            raise ValueError(f'no socket path in {address}')
+        return "unix", path
+
+    host, _, port = address.rpartition(':')
+    port = int(port)
+    if not 0 <= port <= 65535:
+        raise ValueError(f'invalid port in {address}')
+    if host and not is_loopback(host):
+        raise ValueError(f'{host} is not a loopback address')
+    return host.strip('[]') or "127.0.0.1", port
+
+
+def _payload(answer: dict) -> bytes:
+    # the same bytes as the printed output of the tasks, final newline included
+    return (json.dumps(answer, indent=4) + '\n').encode('utf-8')
+
+
+async def _discard(reader: asyncio.StreamReader, length: int) -> None:
+    while length > 0:
+        chunk = await reader.read(min(length, 1 << 16))
+        if not chunk:
+            break
+        length -= len(chunk)
+
+
+def _pairs_from(data: dict) -> list[list[str]]:
+    pairs = data.get("keys")
+    if not isinstance(pairs, list):
+        raise QueryError("keys")
+    for pair in pairs:
+        if not isinstance(pair, list) or len(pair) != 2 or not all(isinstance(name, str) for name in pair):
+            raise QueryError("keys")
+    return pairs
+
+
+def _non_negative_int(data: dict, key: str) -> int:
+    value = data.get(key)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise QueryError(key)
+    return value
+
+
+class QueryServer:
+    """
+    Answers k-seq, indirect-connection and fixed-length-path queries over one corpus.
+
+    Attributes:
+        sorted_sentences (corpus.EncodedCorpus): The sentences in sorted order, as word ids.
+        suffix_index (index.SuffixArrayIndex): The k-seq index of sorted_sentences.
+        graph (graph.CSRGraph): The people graph: names that share at least t windows of k sentences.
+        reachability (graph.ReachabilityIndex): The components and cached BFS results of the graph.
+        path_finder (graph.SimplePathFinder): The fixed-length path search over the graph.
+        routes (dict[str, Callable]): The query handler of every endpoint.
+        query_timeout (float): The longest a query is waited for, in seconds.
+        max_body_bytes (int): The largest request body accepted.
+    """
+
+    def __init__(self, sentence_list: list[list[str]], names_list: list, k: int, t: int,
+                 query_timeout: float = QUERY_TIMEOUT, max_body_bytes: int = MAX_BODY_BYTES):
+        self.sorted_sentences = corpus.EncodedCorpus(sorted(sentence_list))
+        self.suffix_index = index.SuffixArrayIndex(self.sorted_sentences)
+        self.graph = graph.CSRGraph.from_counts(utils.count_pair_windows(sentence_list, names_list, k), t)
+        self.reachability = graph.ReachabilityIndex(self.graph)
+        self.path_finder = graph.SimplePathFinder(self.graph)
+        self.routes: dict[str, Callable[[dict], dict]] = {
+            "/kseq": self.query_kseq,
+            "/indirect": self.query_indirect,
+            "/fixed_length": self.query_fixed_length,
+        }
+        self.query_timeout = query_timeout
+        self.max_body_bytes = max_body_bytes
+
+    def query_kseq(self, data: dict) -> dict:
+        """
+        Answers a task 4 query; data has the format of a --qsek_query_path file.
+        """
+        keys = data.get("keys", [])
+        if not isinstance(keys, list):
+            raise QueryError("keys")
+        kseq_list = []
+        for item in keys:
+            words = item if isinstance(item, list) else [item]
+            if not all(isinstance(word, str) for word in words):
+                raise QueryError("keys")
+            kseq_list.append(" ".join(words))
+
+        seq_dict = utils.find_seq_in_index(self.sorted_sentences, self.suffix_index,
+                                           utils.remove_duplicates_seq(kseq_list))
+        return {"Question 4": {'K-Seq Matches': seq_dict}}
+
+    def query_indirect(self, data: dict) -> dict:
+        """
+        Answers a task 7 query; data has the format of a --pairs file plus "maximal_distance".
+        """
+        max_dist = _non_negative_int(data, "maximal_distance")
+        res = [[name1, name2, self.reachability.is_connected_within(self.graph.node(name1), self.graph.node(name2),
+                                                                    max_dist)]
+               for name1, name2 in _pairs_from(data)]
+        return {"Question 7": utils.sort_connection_results(res)}
+
+    def query_fixed_length(self, data: dict) -> dict:
+        """
+        Answers a task 8 query; data has the format of a --pairs file plus "fixed_length".
+        """
+        fixed_length = _non_negative_int(data, "fixed_length")
+        pairs = _pairs_from(data)
+        node_pairs = [[self.graph.node(name1), self.graph.node(name2)] for name1, name2 in pairs]
+        connections = utils.check_pairs_by_source(self.path_finder, node_pairs, fixed_length)
+        res = [[name1, name2, connected] for (name1, name2), connected in zip(pairs, connections)]
+        return {"Question 8": utils.sort_connection_results(res)}
+
+    def dispatch(self, method: str, path: str, body: bytes) -> tuple[str, dict]:
+        """
+        Answers one request.
+        :return: the HTTP status line and the JSON answer
+        """
+        handler = self.routes.get(path)
+        if handler is None:
+            return "404 Not Found", {"error": "unknown endpoint"}
+        if method != "POST":
+            return "405 Method Not Allowed", {"error": "use POST"}
+
+        try:
+            data = json.loads(body or b'{}')
+            if not isinstance(data, dict):
+                raise QueryError("body")
+            return "200 OK", handler(data)
+        except (QueryError, ValueError):
+            return "400 Bad Request", {"error": "invalid input"}
+
+    def respond(self, method: str, path: str, body: bytes) -> tuple[str, bytes]:
+        """
+        Answers one request and encodes the answer, in a worker thread.
+        :return: the HTTP status line and the JSON payload
+        """
+        status, answer = self.dispatch(method, path, body)
+        return status, _payload(answer)
+
+    async def answer(self, method: str, path: str, body: bytes) -> tuple[str, bytes]:
+        """
+        Runs respond in the loop's executor, so the other connections are served meanwhile.
+        A query still running at the timeout is answered with 503; its thread finishes it in the
+        background, since a thread cannot be stopped.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(None, self.respond, method, path, body),
+                                          self.query_timeout)
+        except asyncio.TimeoutError:
+            return "503 Service Unavailable", _payload({"error": "query timed out"})
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves the requests of one connection, keeping it open between requests unless the client
+        asks to close it.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > self.max_body_bytes:
+                    # the body is not kept, so the connection cannot be reused
+                    status, payload = "413 Payload Too Large", _payload({"error": "body too large"})
+                    close = True
+                    body = None
+                else:
+                    body = await reader.readexactly(length)
+                    status, payload = await self.answer(method, path.split('?', 1)[0], body)
+                    close = headers.get('connection', '').lower() == 'close'
+                writer.write(f'HTTP/1.1 {status}\r\n'
+                             f'Content-Type: application/json\r\n'
+                             f'Content-Length: {len(payload)}\r\n'
+                             f'Connection: {"close" if close else "keep-alive"}\r\n\r\n'.encode('latin-1') + payload)
+                await writer.drain()
+                if body is None:
+                    if writer.can_write_eof():
+                        writer.write_eof()
+                    await asyncio.wait_for(_discard(reader, length), DISCARD_SECONDS)
+                if close:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, address: str) -> None:
+        """
+        Listens on the address until the process is stopped.
+        """
+        host, port = parse_address(address)
+        if host == "unix":
+            listener = await asyncio.start_unix_server(self.handle_connection, path=port)
+        else:
+            listener = await asyncio.start_server(self.handle_connection, host, port)
+        async with listener:
+            await listener.serve_forever()
+
+    def serve_forever(self, address: str) -> None:
+        """
+        Runs the server until it is interrupted.
+        """
+        try:
+            asyncio.run(self.serve(address))
+        except KeyboardInterrupt:
+            pass
@@ -12,14 +12,23 @@ It includes helper methods for:
 import csv
 import re
 import json
+import struct
+import sys
 from collections import defaultdict
+from collections.abc import Iterator
 
+# Import project files:
+from . import corpus
+from . import graph
+from . import index
+from . import output
 
-def open_csv_format_for_sentences(file_path: str) -> list[list[str]]:
+
+def iter_csv_format_for_sentences(file_path: str) -> Iterator[list[str]]:
     """
-    This function receives a path to a CSV file and returns its content as a list of lists.
+    This function receives a path to a CSV file and yields its rows one at a time,
+    skipping the header, so the whole file is never held in memory.
     """
-    string = []
     with open(file_path, mode='r', encoding='utf-8') as file:
         reader = csv.reader(file)
         header = True
@@ -27,8 +36,14 @@ def open_csv_format_for_sentences(file_path: str) -> list[list[str]]:
             if header:
                 header = False
                 continue
-            string.append(row)
-    return string
+            yield row
+
+
+def open_csv_format_for_sentences(file_path: str) -> list[list[str]]:
+    """
+    This function receives a path to a CSV file and returns its content as a list of lists.
+    """
+    return list(iter_csv_format_for_sentences(file_path))
 
 
 def open_csv_format_for_name(file_path: str) -> list[list[list[str]]]:
@@ -205,9 +220,19 @@ def strip_name_list(string: str | None = None) -> str:
 def task1_into_lists(json_filename_path: str) -> tuple[list, list[str]]:
     """
     This function reads a JSON file and extracts the processed sentences and names.
+    A binary preprocessed corpus file is memory-mapped instead, and its sentences are
+    decoded only when they are read.
     :param json_filename_path
     :return: A tuple containing (list of sentences, list of names)
         """
+    if json_filename_path.endswith(corpus.CORPUS_EXTENSION):
+        try:
+            mapped_corpus = corpus.MappedCorpus(json_filename_path)
+        except (ValueError, KeyError, struct.error):
+            print("invalid input")
+            sys.exit(1)
+        return mapped_corpus, mapped_corpus.names
+
     with open(json_filename_path, 'r', encoding='utf-8') as file:
         data = json.load(file)
 
@@ -217,37 +242,41 @@ def task1_into_lists(json_filename_path: str) -> tuple[list, list[str]]:
     return sentences, names
 
 
-def count_common_words(sentence_list: str, n: int) -> dict[str, list[list[str]]]:
+def count_common_words(sentence_list: str, n: int, vocabulary: corpus.Vocabulary | None = None)\
+        -> dict[str, list[list[str]]]:
     """
     this func receives a list of sentences and returns a dict of the count of each seq according to
-    the given N
+    the given N. the seqs are counted as tuples of word ids and joined into strings only once, at the end
     :return: dict[str, int]
     """
-    words_dict = {}
+    if vocabulary is None:
+        vocabulary = corpus.Vocabulary()
+
+    ids_dict = {}
     for sublist in sentence_list:
         if len(sublist) < n:
             continue
-        for i in range(len(sublist) - n + 1):
-            new_word = ' '.join(sublist[i:i + n])
-            if new_word in words_dict:
-                words_dict[new_word] += 1
-            else:
-                words_dict[new_word] = 1
+        ids = tuple(vocabulary.encode(sublist))
+        for i in range(len(ids) - n + 1):
+            seq_ids = ids[i:i + n]
+            ids_dict[seq_ids] = ids_dict.get(seq_ids, 0) + 1
 
+    words_dict = {vocabulary.join(seq_ids): count for seq_ids, count in ids_dict.items()}
     sorted_dict = {key: words_dict[key] for key in sorted(words_dict)}
 
     return sorted_dict
 
 
-
-def put_in_format_task2(sentence_list: str, n: int) -> list[list[str]]:
+def put_in_format_task2(sentence_list: str, n: int, vocabulary: corpus.Vocabulary | None = None)\
+        -> list[list[str]]:
     """
     this func receives a list of sentences and returns a dict fo the count of each seq
     :param sentence_list:
     :param n:
+    :param vocabulary: a vocabulary shared between calls, so each word gets its id once
     :return:
     """
-    words_dict = count_common_words(sentence_list, n)
+    words_dict = count_common_words(sentence_list, n, vocabulary)
     final_list = [f'{n}_seq']
     count_list = [[key, value] for key, value in words_dict.items()]
     final_list.append(count_list)
@@ -257,7 +286,9 @@ def put_in_format_task2(sentence_list: str, n: int) -> list[list[str]]:
 def count_names_in_sentence(sentence_list: list[list[str]], name_list: list[str]) -> dict[str, int]:
     """
     this func counts how many times each word occurs in the sentence and returns a dict of main name as
-    key and the number of times it occurs in the sentence as value
+    key and the number of times it occurs in the sentence as value.
+    the names are compiled once into a NameMatcher, so every sentence is matched in a single pass
+    over its words
     :param sentence_list:
     :param name_list:
     :return:
@@ -269,15 +300,11 @@ def count_names_in_sentence(sentence_list: list[list[str]], name_list: list[str]
         main_name = " ".join(full_name[0])
         return_dict[main_name] = 0
 
-    for sublist in sentence_list:
-        for full_name in name_list:
-            main_name = " ".join(full_name[0])
-            for name in full_name[0]:
-                return_dict[main_name] += sublist.count(name)
-
-            if full_name[1]:
-                for other_name in full_name[1]:
-                    return_dict[main_name] += sublist.count(other_name)
+    matcher = index.NameMatcher(name_list, corpus.vocabulary_for(sentence_list))
+    for person, count in enumerate(matcher.count_all_mentions(sentence_list)):
+        main_name = matcher.persons[person]
+        if main_name in return_dict:
+            return_dict[main_name] += count
 
     return_dict = {key: value for key, value in return_dict.items() if value != 0}
     return_dict = {k: return_dict[k] for k in sorted(return_dict)}
@@ -326,74 +353,135 @@ def generate_all_seq_from_words_list(words_list: list[str], n: int | None = None
     return res
 
 
-def count_seq_in_sentence(sentence_seq_dict: dict[str, list[str]], kseq_keys_list: list[str])\
-        -> list[list[str]]:
+def build_search_index(sentences_list: list[list[str]]) -> tuple[corpus.EncodedCorpus, index.SuffixArrayIndex]:
     """
-    this func search all seq according to the seq_list in the sentences and returns a dict when the
-    key is the seq and the value is all the santances
-    the O(1) - because I created a dict of all possible seq when the key is the seq and the value is all the santances
-    and in this func I created a set of all the possible seq in the list so the loop if only to search
-    for the correct seq matching to the key
-    :return: dict[str,list[str]]
+    this func sorts and encodes the sentences, and builds their suffix array index
+    :return: the sorted sentences and their suffix array index
     """
-    res = []
-    sentence_keys_set = set(sentence_seq_dict.keys())
+    encoded_corpus = corpus.EncodedCorpus(sorted(sentences_list))
+    return encoded_corpus, index.SuffixArrayIndex(encoded_corpus)
+
+
+def find_seq_in_index(sorted_sentences: corpus.EncodedCorpus | corpus.MappedCorpus,
+                      suffix_index: index.SuffixArrayIndex, kseq_keys_list: list[str]) -> list[list[str]]:
+    """
+    this func answers the search seqs from the suffix array index of the sorted sentences
+    :return: list[list[str]]
+    """
+    return list(iter_seq_in_index(sorted_sentences, suffix_index, kseq_keys_list))
+
+
+def iter_seq_in_index(sorted_sentences: corpus.EncodedCorpus | corpus.MappedCorpus,
+                      suffix_index: index.SuffixArrayIndex, kseq_keys_list: list[str],
+                      table: output.SentenceTable | None = None) -> Iterator[list]:
+    """
+    this func yields the [seq, sentences] item of every search seq found in the suffix array index,
+    in sorted order, decoding the sentences of one seq at a time. with a table the sentences are
+    replaced by their ids in the table, and every sentence of the index is decoded only once
+    :return: Iterator[list]
+    """
+    table_ids: dict[int, int] = {}
     for seq in sorted(kseq_keys_list):
-        if seq in sentence_keys_set:
-            seq_item = [seq, sentence_seq_dict[seq]]
-            res.append(seq_item)
+        seq_ids = sorted_sentences.vocabulary.lookup(seq.split(' '))
+        if seq_ids is None:
+            continue
+        sentence_ids = suffix_index.find(seq_ids)
+        if not sentence_ids:
+            continue
+        if table is None:
+            yield [seq, [sorted_sentences.decode(sentence_id) for sentence_id in sentence_ids]]
+            continue
 
-    return res
+        for sentence_id in sentence_ids:
+            if sentence_id not in table_ids:
+                table_ids[sentence_id] = table.add(sorted_sentences.decode(sentence_id))
+        yield [seq, [table_ids[sentence_id] for sentence_id in sentence_ids]]
 
 
-def generate_all_search_seq_from_sentences_list(sentences_list: list[str], n: int | None = None)\
-        -> dict[str, list[str]]:
+def load_search_index(file_path: str) -> tuple[corpus.MappedCorpus, index.SuffixArrayIndex]:
     """
-    this func returns a dict of all possible seq when the key is the seq and the value is all the santances
+    this func opens an index file written by task 4 --build_index
+    :return: the sorted sentences and their suffix array index
+    """
+    try:
+        return index.load_index(file_path)
+    except (ValueError, KeyError, struct.error):
+        print("invalid input")
+        sys.exit(1)
+
+
+def generate_all_search_seq_from_sentences_list(sentences_list: list[str], vocabulary: corpus.Vocabulary,
+                                                n: int | None = None) -> dict[tuple[int, ...], list[str]]:
+    """
+    this func returns a dict of all possible seq when the key is the seq (as a tuple of word ids) and the
+    value is all the santances
     :return:
     """
     seq__all_sentences_dict = defaultdict(list)
-    sentences_list.sort()
-    for words_list in sentences_list:
-        combinations = generate_all_seq_from_words_list(words_list, n)
+    for words_list in sorted(sentences_list):
+        combinations = generate_all_seq_from_words_list(tuple(vocabulary.encode(words_list)), n)
         for seq in combinations:
-            seq__all_sentences_dict[' '.join(seq)].append(words_list)
+            seq__all_sentences_dict[seq].append(words_list)
     return seq__all_sentences_dict
 
 
 def check_names_in_sentences(sentence_list: list[list[str]], names_list: list[list[str]])\
         -> dict[str, list[str]]:
     """
-    this func checks names in sentences and returns a dict of names as keys and lists of santances as values
+    this func checks names in sentences and returns a dict of names as keys and lists of santances as values.
+    the sentences of every person are the union of the posting lists of its name words
     :return: dict[main_name,list[sentence]]
     """
-    return_dict = {}
-    sorted_sentences_list = sorted(sentence_list, key=lambda x: x[0])
-    for full_name in names_list:
+    encoded_corpus = corpus.encode_sentences(sentence_list)
+    matcher = index.NameMatcher(names_list, encoded_corpus.vocabulary)
+    inverted_index = index.InvertedIndex(encoded_corpus, matcher.table)
+
+    sentences_ids_dict = {}
+    for person, full_name in enumerate(names_list):
         main_name = " ".join(full_name[0])
-        return_dict[main_name] = []
+        sentences_ids = sentences_ids_dict.setdefault(main_name, set())
+        sentences_ids.update(inverted_index.union(matcher.name_ids[person]))
 
-    for sublist in sorted_sentences_list:
-        for full_name in names_list:
-            main_name = " ".join(full_name[0])
-            for name in full_name[0]:
-                if name in sublist:
-                    return_dict[main_name].append(sublist)
+    return_dict = {}
+    for key in sorted(sentences_ids_dict):
+        sentences = {tuple(encoded_corpus.decode(sentence_id)) for sentence_id in sentences_ids_dict[key]}
+        if sentences:
+            return_dict[key] = sorted(list(sentence) for sentence in sentences)
 
-            for other_name in full_name[1]:
-                if other_name in sublist:
-                    return_dict[main_name].append(sublist)
+    return return_dict
 
-    for key in return_dict:
-        return_dict[key] = [list(sublist) for sublist in {tuple(sublist) for sublist in return_dict[key]}]
 
-    for key in return_dict:
-        return_dict[key] = sorted(return_dict[key])
+def count_pair_windows(sentences_list: list[list[str]], names_list: list[list[str]], k: int,
+                       engine: str = "python") -> dict[tuple[str, str], int]:
+    """
+    this func counts, for every pair of names, the windows of k consecutive sentences that mention both.
+    the persons of each sentence are found once, and the pair counts are updated as the window slides,
+    only for the persons present in it. the "sparse" engine gets the same counts from sparse matrix products
+    :return: dict[(name1, name2), count]
+    :raises ValueError: if k is larger than the number of sentences
+    """
+    vocabulary = corpus.vocabulary_for(sentences_list)
+    matcher = index.NameMatcher(names_list, vocabulary)
+    sentences_persons = (matcher.persons_in(sentence_ids)
+                         for sentence_ids in corpus.iter_encoded_sentences(sentences_list, vocabulary))
 
-    return_dict = {key: value for key, value in return_dict.items() if value != []}
-    return_dict = {k: return_dict[k] for k in sorted(return_dict.keys())}
+    if engine == "sparse":
+        pair_counts, sentences_count = graph.sparse_window_cooccurrence(sentences_persons, len(names_list), k)
+    else:
+        window_counter = graph.SlidingWindowCooccurrence(k)
+        for persons in sentences_persons:
+            window_counter.add(persons)
+        pair_counts, sentences_count = window_counter.finish(), window_counter.sentences_count
 
-    return return_dict
+    if k > sentences_count:
+        raise ValueError(f'window of {k} sentences over {sentences_count} sentences')
+
+    count_mention_dict = {}
+    for (i, j), count in pair_counts.items():
+        pair_key = (' '.join(names_list[i][0]), ' '.join(names_list[j][0]))
+        count_mention_dict[pair_key] = count_mention_dict.get(pair_key, 0) + count
+
+    return count_mention_dict
 
 
 def all_possible_pairs_list(names_list: list[list[str]]) -> list[list[str]]:
@@ -435,6 +523,71 @@ def sort_pairs_list(pairs_dict: dict[str, int]) -> dict[str, list[str]]:
     return sorted_data
 
 
+def graph_from_task6_pairs(pairs: list[list[list[str]]]) -> dict[str, list[str]]:
+    """
+    this func builds the graph of the pairs of a task 6 output: the names of every pair are joined
+    into strings and become neighbours
+    :return: dict[str, list]
+    """
+    flattened_lists = []
+    for pair in pairs:
+        flattened_pairs = [[' '.join(sublist)] for sublist in pair]
+        flattened_lists.append(flattened_pairs)
+
+    new_graph = {}
+
+    for pair in flattened_lists:
+        pair1, pair2 = pair[0][0], pair[1][0]
+
+        if pair1 not in new_graph:
+            new_graph[pair1] = []
+        if pair2 not in new_graph:
+            new_graph[pair2] = []
+
+        new_graph[pair1].append(pair2)
+        new_graph[pair2].append(pair1)
+
+    return new_graph
+
+
+def load_people_graph(file_path: str) -> graph.CSRGraph:
+    """
+    this func opens a graph file written by task 6 --save_graph
+    :return: the people graph
+    """
+    try:
+        return graph.CSRGraph.load(file_path)
+    except (ValueError, KeyError, struct.error):
+        print("invalid input")
+        sys.exit(1)
+
+
+def check_pairs_by_source(path_finder: graph.SimplePathFinder, pairs: list[list], fixed_length: int)\
+        -> list[bool]:
+    """
+    this func checks the fixed-length path of every pair of persons, with one search for all the
+    pairs that share the same first person
+    :return: list[bool]
+    """
+    targets_by_source = {}
+    for name1, name2 in pairs:
+        targets_by_source.setdefault(name1, set()).add(name2)
+
+    connected = {name1: path_finder.targets_with_path(name1, targets, fixed_length)
+                 for name1, targets in targets_by_source.items()}
+    return [name2 in connected[name1] for name1, name2 in pairs]
+
+
+def sort_connection_results(res: list[list]) -> list[list]:
+    """
+    this func sorts the names of every [name1, name2, ...] result, and then the results themselves
+    :return:
+    """
+    for item in res:
+        item[:2] = sorted(item[:2])
+    return sorted(res, key=lambda x: (x[0], x[1]))
+
+
 def sort_groups(groups_list: list[list[str]]) -> list[list[str]]:
     """
     this func sorts the groups of connected sentences in the graph and returns a dict of the number
@@ -6,9 +6,42 @@ no irrelevant arguments are used, and that all file paths and extensions are val
 
 # Import:
 import argparse
+import importlib.util
 import sys
 import os
 
+# Import project files:
+from . import clustering
+from . import corpus
+from . import graph
+from . import index
+from . import output
+from . import server
+
+
+def validate_output_args(args: argparse.Namespace) -> None:
+    """
+    Validates the output arguments shared by all the tasks.
+
+    :param args: Parsed command-line arguments
+    :return: None; exits the program on invalid input
+    """
+    if args.sentence_ids and args.task not in (4, 5, 9):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.output is None:
+        return
+
+    if args.task == 10 or not args.output.endswith(output.OUTPUT_EXTENSION):
+        print("invalid input")
+        sys.exit(1)
+
+    directory = os.path.dirname(args.output)
+    if directory and not os.path.isdir(directory):
+        print("invalid input")
+        sys.exit(1)
+
 
 def validate_args_CleanText(args: argparse.Namespace) -> None:
     """
@@ -23,6 +56,16 @@ def validate_args_CleanText(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if (args.build_index is not None or args.index is not None or args.save_graph is not None or
+            args.thresholds is not None or args.dendrogram or args.serve is not None or
+            args.engine is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
     if args.sentences is None or args.remove_words is None or args.names is None:
         print("invalid input")
         sys.exit(1)
@@ -37,6 +80,14 @@ def validate_args_CleanText(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if args.workers is not None and args.workers < 1:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.save_preprocessed is not None and not args.save_preprocessed.endswith(corpus.CORPUS_EXTENSION):
+        print("invalid input")
+        sys.exit(1)
+
 
 def validate_args_CountingSequences(args: argparse.Namespace) -> None:
     """
@@ -49,10 +100,21 @@ def validate_args_CountingSequences(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.build_index is not None or args.index is not None or args.save_graph is not None or
+            args.thresholds is not None or args.dendrogram or args.serve is not None or
+            args.engine is not None):
+        print("invalid input")
+        sys.exit(1)
+
     if args.maxk is None or not isinstance(args.maxk, int) or args.maxk < 0:
         print("invalid input")
         sys.exit(1)
 
+    if (args.top is not None and args.top < 1) or (args.min_count is not None and args.min_count < 1):
+        print("invalid input")
+        sys.exit(1)
+
     if args.names is not None:
         print("invalid input")
         sys.exit(1)
@@ -75,7 +137,7 @@ def validate_args_CountingSequences(args: argparse.Namespace) -> None:
             print("invalid input")
             sys.exit(1)
 
-        if not args.preprocessed.endswith(".json"):
+        if not args.preprocessed.endswith((".json", corpus.CORPUS_EXTENSION)):
             print("invalid input")
             sys.exit(1)
     else:
@@ -94,6 +156,17 @@ def validate_args_CountingPersonMentions(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.build_index is not None or args.index is not None or args.save_graph is not None or
+            args.thresholds is not None or args.dendrogram or args.serve is not None or
+            args.engine is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
     if args.sentences is not None and args.names is not None:
         if args.remove_words is None:
             print("invalid input")
@@ -122,7 +195,7 @@ def validate_args_CountingPersonMentions(args: argparse.Namespace) -> None:
             print("invalid input")
             sys.exit(1)
 
-        if not args.preprocessed.endswith(".json"):
+        if not args.preprocessed.endswith((".json", corpus.CORPUS_EXTENSION)):
             print("invalid input")
             sys.exit(1)
 
@@ -142,6 +215,36 @@ def validate_args_SearchEngine(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.save_graph is not None or args.thresholds is not None or args.dendrogram or
+            args.serve is not None or args.engine is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.names is not None:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.index is not None:
+        if (args.sentences is not None or args.preprocessed is not None or args.build_index is not None
+                or args.remove_words is not None):
+            print("invalid input")
+            sys.exit(1)
+
+        if not os.path.isfile(args.index) or not args.index.endswith(index.INDEX_EXTENSION):
+            print("invalid input")
+            sys.exit(1)
+
+        if args.qsek_query_path is None or not args.qsek_query_path.endswith(".json"):
+            print("invalid input")
+            sys.exit(1)
+
+        return
+
     if args.sentences is not None and args.preprocessed is not None:
         print("invalid input")
         sys.exit(1)
@@ -150,11 +253,15 @@ def validate_args_SearchEngine(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
-    if args.names is not None:
+    if args.build_index is not None and not args.build_index.endswith(index.INDEX_EXTENSION):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.qsek_query_path is None and args.build_index is None:
         print("invalid input")
         sys.exit(1)
 
-    if not args.qsek_query_path.endswith(".json") or args.qsek_query_path is None:
+    if args.qsek_query_path is not None and not args.qsek_query_path.endswith(".json"):
         print("invalid input")
         sys.exit(1)
 
@@ -176,7 +283,7 @@ def validate_args_SearchEngine(args: argparse.Namespace) -> None:
             print("invalid input")
             sys.exit(1)
 
-        if not args.preprocessed.endswith(".json"):
+        if not args.preprocessed.endswith((".json", corpus.CORPUS_EXTENSION)):
             print("invalid input")
 
             sys.exit(1)
@@ -196,6 +303,17 @@ def validate_args_PersonContextAnalyzer(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.build_index is not None or args.index is not None or args.save_graph is not None or
+            args.thresholds is not None or args.dendrogram or args.serve is not None or
+            args.engine is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
     if args.maxk is None or not isinstance(args.maxk, int) or args.maxk < 0:
         print("invalid input")
         sys.exit(1)
@@ -227,7 +345,7 @@ def validate_args_PersonContextAnalyzer(args: argparse.Namespace) -> None:
             print("invalid input")
             sys.exit(1)
 
-        if not args.preprocessed.endswith(".json"):
+        if not args.preprocessed.endswith((".json", corpus.CORPUS_EXTENSION)):
             print("invalid input")
             sys.exit(1)
 
@@ -246,6 +364,16 @@ def validate_args_DirectConnection(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.build_index is not None or args.index is not None or args.thresholds is not None or
+            args.dendrogram or args.serve is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
     if args.windowsize is None or not isinstance(args.windowsize, int) or args.windowsize < 0:
         print("invalid input")
         sys.exit(1)
@@ -254,6 +382,19 @@ def validate_args_DirectConnection(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if args.engine is not None and args.engine not in graph.ENGINES:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.engine == "sparse" and (importlib.util.find_spec("numpy") is None
+                                    or importlib.util.find_spec("scipy") is None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.save_graph is not None and not args.save_graph.endswith(graph.GRAPH_EXTENSION):
+        print("invalid input")
+        sys.exit(1)
+
     if args.sentences is not None and args.preprocessed is not None:
         print("invalid input")
         sys.exit(1)
@@ -286,7 +427,7 @@ def validate_args_DirectConnection(args: argparse.Namespace) -> None:
             print("invalid input")
             sys.exit(1)
 
-        if not args.preprocessed.endswith(".json"):
+        if not args.preprocessed.endswith((".json", corpus.CORPUS_EXTENSION)):
             print("invalid input")
             sys.exit(1)
     else:
@@ -304,10 +445,24 @@ def validate_args_IndirectConnection(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.build_index is not None or args.index is not None or args.thresholds is not None or
+            args.dendrogram or args.serve is not None or args.engine is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
     if args.maximal_distance is None or not isinstance(args.maximal_distance, int) or args.maximal_distance < 0:
         print("invalid input")
         sys.exit(1)
 
+    if args.save_graph is not None:
+        print("invalid input")
+        sys.exit(1)
+
     if args.pairs is None:
         print("invalid input")
         sys.exit(1)
@@ -369,7 +524,7 @@ def validate_args_IndirectConnection(args: argparse.Namespace) -> None:
             sys.exit(1)
 
         if args.preprocessed is not None:
-            if not args.preprocessed.endswith(".json"):
+            if not args.preprocessed.endswith((".json", graph.GRAPH_EXTENSION)):
                 print("invalid input")
                 sys.exit(1)
 
@@ -388,10 +543,24 @@ def validate_args_FixedLengthPathChecker(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.build_index is not None or args.index is not None or args.thresholds is not None or
+            args.dendrogram or args.serve is not None or args.engine is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
     if args.fixed_length is None or not isinstance(args.fixed_length, int) or args.fixed_length < 0:
         print("invalid input")
         sys.exit(1)
 
+    if args.save_graph is not None:
+        print("invalid input")
+        sys.exit(1)
+
     if args.sentences is not None:
         if (not os.path.isfile(args.sentences) or not os.path.isfile(args.remove_words)
                 or not os.path.isfile(args.names)):
@@ -455,7 +624,7 @@ def validate_args_FixedLengthPathChecker(args: argparse.Namespace) -> None:
                 print("invalid input")
                 sys.exit(1)
 
-            if not args.preprocessed.endswith(".json"):
+            if not args.preprocessed.endswith((".json", graph.GRAPH_EXTENSION)):
                 print("invalid input")
                 sys.exit(1)
 
@@ -475,7 +644,42 @@ def validate_args_SentenceClustering(args: argparse.Namespace) -> None:
         print("invalid input")
         sys.exit(1)
 
-    if args.threshold is None or not isinstance(args.threshold, int) or args.threshold < 0:
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.build_index is not None or args.index is not None or args.save_graph is not None or
+            args.serve is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.thresholds is not None or args.dendrogram:
+        if args.threshold is not None or (args.thresholds is not None and args.dendrogram):
+            print("invalid input")
+            sys.exit(1)
+
+        if args.engine is not None and args.engine != "python":
+            print("invalid input")
+            sys.exit(1)
+
+        if args.thresholds is not None:
+            try:
+                clustering.parse_thresholds(args.thresholds)
+            except ValueError:
+                print("invalid input")
+                sys.exit(1)
+
+    elif args.threshold is None or not isinstance(args.threshold, int) or args.threshold < 0:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.engine is not None and args.engine not in clustering.ENGINES:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.engine == "sparse" and (importlib.util.find_spec("numpy") is None
+                                    or importlib.util.find_spec("scipy") is None):
         print("invalid input")
         sys.exit(1)
 
@@ -514,10 +718,86 @@ def validate_args_SentenceClustering(args: argparse.Namespace) -> None:
                 print("invalid input")
                 sys.exit(1)
 
-            if not args.preprocessed.endswith(".json"):
+            if not args.preprocessed.endswith((".json", corpus.CORPUS_EXTENSION)):
                 print("invalid input")
                 sys.exit(1)
 
     else:
         print("invalid input")
         sys.exit(1)
+
+
+def validate_args_LocalQueryServer(args: argparse.Namespace) -> None:
+    """
+    this func validates arguments for task 10
+    :param args:
+    :return:
+    """
+    if (args.maxk is not None or args.qsek_query_path is not None or args.fixed_length is not None
+            or args.maximal_distance is not None or args.pairs is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if (args.workers is not None or args.save_preprocessed is not None or
+            args.build_index is not None or args.index is not None or args.save_graph is not None or
+            args.thresholds is not None or args.dendrogram or args.engine is not None):
+        print("invalid input")
+        sys.exit(1)
+
+    if args.top is not None or args.min_count is not None:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.serve is None:
+        print("invalid input")
+        sys.exit(1)
+
+    try:
+        server.parse_address(args.serve)
+    except ValueError:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.windowsize is None or not isinstance(args.windowsize, int) or args.windowsize < 0:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.threshold is None or not isinstance(args.threshold, int) or args.threshold < 0:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.sentences is not None and args.preprocessed is not None:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.sentences is None and args.preprocessed is None:
+        print("invalid input")
+        sys.exit(1)
+
+    if args.sentences is not None:
+        if args.remove_words is None or args.names is None:
+            print("invalid input")
+            sys.exit(1)
+
+        if (not os.path.isfile(args.sentences) or not os.path.isfile(args.names)
+                or not os.path.isfile(args.remove_words)):
+            print("invalid input")
+            sys.exit(1)
+
+        if (not args.sentences.endswith(".csv") or not args.names.endswith(".csv")
+                or not args.remove_words.endswith(".csv")):
+            print("invalid input")
+            sys.exit(1)
+
+    elif args.preprocessed is not None:
+        if args.names is not None or args.remove_words is not None:
+            print("invalid input")
+            sys.exit(1)
+
+        if not os.path.isfile(args.preprocessed):
+            print("invalid input")
+            sys.exit(1)
+
+        if not args.preprocessed.endswith((".json", corpus.CORPUS_EXTENSION)):
+            print("invalid input")
+            sys.exit(1)
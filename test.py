@@ -4,10 +4,24 @@ from unittest.mock import mock_open
 from unittest.mock import patch
 import tempfile
 import csv
+import io
 import json
 import os
+import shutil
+import time
 import argparse
+import asyncio
+import importlib.util
 import pytest
+from app import Text_Cleaner
+from app import clustering
+from app import corpus
+from app import graph
+from app import index
+from app import output
+from app import sequences
+from app import server
+from app import utils
 
 
 class TestTask1IntoLists(unittest.TestCase):
@@ -468,5 +482,594 @@ class TestCleanNames(unittest.TestCase):
         self.assertEqual(clean_names.remove_duplicate_words(input_data_6), expected_output_6)
 
 
+class TestCleanerPipeline(unittest.TestCase):
+
+    def test_clean_matches_clean_string(self):
+        """
+        test that the pipeline cleans strings exactly like utils.clean_string
+        """
+        remove_words = [['the'], ['a'], ['are']]
+        pipeline = Text_Cleaner.CleanerPipeline(remove_words)
+        for string in ["Hello, World!", "The cat ate a rat", "  are   you THERE?? ", "", "%$#",
+                       ['They are here'], "a.the,a-are"]:
+            self.assertEqual(pipeline.clean(string), utils.clean_string(string, remove_words))
+
+    def test_clean_with_phrase_remove_word(self):
+        """
+        test that remove words spanning several tokens keep the regex behaviour
+        """
+        remove_words = [['as'], ['as well']]
+        pipeline = Text_Cleaner.CleanerPipeline(remove_words)
+        for string in ["as well as", "well as well", "As Well!"]:
+            self.assertEqual(pipeline.clean(string), utils.clean_string(string, remove_words))
+
+    def test_clean_tokens(self):
+        pipeline = Text_Cleaner.CleanerPipeline([['is']])
+        self.assertEqual(pipeline.clean_tokens("This is it!"), ['this', 'it'])
+        self.assertEqual(pipeline.clean_tokens("is"), [])
+
+
+class TestIterCleanSentences(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_csv = tempfile.NamedTemporaryFile(delete=False, mode='w', newline='', encoding='utf-8')
+        writer = csv.writer(self.temp_csv)
+        writer.writerow(["sentence"])
+        writer.writerow(["Hello, world!"])
+        writer.writerow(["the"])
+        writer.writerow(["Python is great"])
+        self.temp_csv.close()
+
+        self.temp_remove = tempfile.NamedTemporaryFile(delete=False, mode='w', newline='', encoding='utf-8')
+        self.temp_remove.write('words\nthe\nis\n')
+        self.temp_remove.close()
+
+        self.cleaner = Text_Cleaner.CleanSentences(self.temp_csv.name, self.temp_remove.name)
+
+    def tearDown(self):
+        os.remove(self.temp_csv.name)
+        os.remove(self.temp_remove.name)
+
+    def test_iter_clean_sentences(self):
+        stream = self.cleaner.iter_clean_sentences()
+        self.assertEqual(next(stream), ['hello', 'world'])
+        self.assertEqual(list(stream), [['python', 'great']])
+        self.assertEqual(list(self.cleaner), self.cleaner.generate_clean_sentences_list())
+
+    def test_workers_match_serial(self):
+        serial = self.cleaner.generate_clean_sentences_list()
+        self.assertEqual(self.cleaner.generate_clean_sentences_list(workers=2, chunk_size=1), serial)
+
+
+class TestVocabulary(unittest.TestCase):
+
+    def test_encode_and_decode(self):
+        vocabulary = corpus.Vocabulary()
+        ids = vocabulary.encode(['harry', 'met', 'harry'])
+        self.assertEqual(list(ids), [0, 1, 0])
+        self.assertEqual(vocabulary.decode(ids), ['harry', 'met', 'harry'])
+        self.assertEqual(vocabulary.join(ids[1:]), 'met harry')
+
+    def test_lookup_does_not_add_words(self):
+        vocabulary = corpus.Vocabulary(['a', 'b'])
+        self.assertEqual(vocabulary.lookup(['b', 'a']), (1, 0))
+        self.assertIsNone(vocabulary.lookup(['a', 'c']))
+        self.assertEqual(len(vocabulary), 2)
+
+    def test_count_common_words(self):
+        sentences = [['a', 'b', 'a', 'b'], ['b', 'a']]
+        self.assertEqual(utils.count_common_words(sentences, 2), {'a b': 2, 'b a': 2})
+
+
+class TestMappedCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_corpus = tempfile.NamedTemporaryFile(delete=False, suffix='.corpus')
+        self.temp_corpus.close()
+        self.sentences = [['harry', 'met', 'ron'], ['ron', 'met', 'hermione', 'granger'], ['harry']]
+        self.names = [[['harry', 'potter'], []], [['ron'], [['ronald']]]]
+        corpus.write_corpus(self.temp_corpus.name, self.sentences, self.names)
+
+    def tearDown(self):
+        os.remove(self.temp_corpus.name)
+
+    def test_task1_into_lists_reads_corpus_file(self):
+        sentences, names = utils.task1_into_lists(self.temp_corpus.name)
+        self.assertEqual(list(sentences), self.sentences)
+        self.assertEqual(sentences[-1], ['harry'])
+        self.assertEqual(names, self.names)
+
+    def test_to_encoded(self):
+        mapped_corpus = corpus.MappedCorpus(self.temp_corpus.name)
+        encoded_corpus = mapped_corpus.to_encoded()
+        self.assertEqual(len(encoded_corpus), 3)
+        self.assertEqual(encoded_corpus.decode(1), self.sentences[1])
+
+    def test_mapped_vocabulary(self):
+        vocabulary = corpus.MappedCorpus(self.temp_corpus.name).vocabulary
+        self.assertIsInstance(vocabulary, corpus.MappedVocabulary)
+        self.assertEqual(len(vocabulary), 5)
+        self.assertEqual(vocabulary.lookup(['ron', 'met']), (2, 1))
+        self.assertIsNone(vocabulary.lookup(['ron', 'ginny']))
+        self.assertEqual(vocabulary.decode([0, 4]), ['harry', 'granger'])
+        self.assertEqual(vocabulary.add('ginny'), 5)
+        self.assertEqual(vocabulary.add('harry'), 0)
+        self.assertEqual(vocabulary.lookup(['ginny']), (5,))
+        self.assertEqual(list(vocabulary.tokens), ['harry', 'met', 'ron', 'hermione', 'granger', 'ginny'])
+
+    def test_truncated_files_are_invalid_input(self):
+        temp_index = tempfile.NamedTemporaryFile(delete=False, suffix=index.INDEX_EXTENSION)
+        temp_index.close()
+        try:
+            index.write_index(temp_index.name, self.sentences)
+            for file_path, load in ((self.temp_corpus.name, utils.task1_into_lists),
+                                    (temp_index.name, utils.load_search_index)):
+                with open(file_path, 'rb') as file:
+                    data = file.read()
+                for cut in (1, 3, 10, 30):
+                    with open(file_path, 'wb') as file:
+                        file.write(data[:-cut])
+                    with patch('builtins.print') as mocked_print, self.assertRaises(SystemExit):
+                        load(file_path)
+                    mocked_print.assert_called_once_with("invalid input")
+        finally:
+            os.remove(temp_index.name)
+
+
+class TestNGramCounter(unittest.TestCase):
+
+    def setUp(self):
+        # sentences shorter than 3 and 4 words have no k-seq of that length
+        self.sentences = [['a', 'b', 'a', 'b', 'c'], ['b', 'a', 'b'], ['c', 'c'], ['d'], ['a', 'b', 'c', 'd']]
+
+    def test_matches_counts_per_k(self):
+        for n in (3, 4, 6):
+            expected = [utils.put_in_format_task2(self.sentences, k) for k in range(1, n + 1)]
+            self.assertEqual(sequences.NGramCounter(n).count(self.sentences).to_list(), expected)
+
+    def test_counts(self):
+        counts = sequences.NGramCounter(3).count(self.sentences).to_list()
+        self.assertEqual(counts[2], ['3_seq', [['a b a', 1], ['a b c', 2], ['b a b', 2], ['b c d', 1]]])
+
+
+class TestPrunedNGramCounter(unittest.TestCase):
+
+    def setUp(self):
+        self.sentences = [['a', 'b', 'a', 'b', 'c'], ['b', 'a', 'b'], ['c', 'c', 'a'], ['d']]
+
+    def test_min_count_matches_exact_counts(self):
+        exact = sequences.NGramCounter(2).count(self.sentences).to_list()
+        pruned = sequences.PrunedNGramCounter(2, min_count=2, sketch_width=2).count(self.sentences).to_list()
+        expected = [[name, [row for row in rows if row[1] >= 2]] for name, rows in exact]
+        self.assertEqual(pruned, expected)
+
+    def test_top_is_exact(self):
+        counter = sequences.PrunedNGramCounter(2, top=2, capacity=4).count(self.sentences)
+        self.assertEqual(counter.to_list(), [['1_seq', [['a', 4], ['b', 4]]],
+                                             ['2_seq', [['a b', 3], ['b a', 2]]]])
+        self.assertEqual(counter.truncated, [])
+
+    def test_top_with_small_capacity_is_exact_prefix(self):
+        counter = sequences.PrunedNGramCounter(2, top=2, capacity=3).count(self.sentences)
+        self.assertEqual(counter.to_list(), [['1_seq', [['a', 4], ['b', 4]]],
+                                             ['2_seq', [['a b', 3]]]])
+        self.assertEqual(counter.truncated, [2])
+
+
+class TestNameMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.sentences = [['harry', 'met', 'ron', 'and', 'harry'], ['ronald', 'weasley'], ['potter', 'ron']]
+        self.names = [[['harry', 'potter'], []], [['ron', 'weasley'], [['ronald']]], [['ginny'], []]]
+
+    def test_count_names_in_sentence(self):
+        self.assertEqual(utils.count_names_in_sentence(self.sentences, self.names),
+                         {'harry potter': 3, 'ron weasley': 3})
+
+    def test_persons_in(self):
+        matcher = index.NameMatcher(self.names, corpus.Vocabulary())
+        sentence_ids = matcher.vocabulary.encode(self.sentences[0])
+        self.assertEqual(matcher.persons_in(sentence_ids), {0, 1})
+
+
+class TestInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.sentences = [[0, 1], [2], [1, 1, 3], [0]]
+
+    def test_postings_and_union(self):
+        inverted_index = index.InvertedIndex(self.sentences)
+        self.assertEqual(list(inverted_index.posting(1)), [0, 2])
+        self.assertEqual(inverted_index.union([0, 3]), [0, 2, 3])
+        self.assertEqual(inverted_index.union([9]), [])
+
+    def test_intersect(self):
+        self.assertEqual(index.intersect([0, 2, 3], [2, 3, 5]), [2, 3])
+
+
+class TestSuffixArrayIndex(unittest.TestCase):
+
+    def test_find_counts_every_occurrence(self):
+        suffix_index = index.SuffixArrayIndex([[0, 1, 0, 1], [1, 0], [2]])
+        self.assertEqual(suffix_index.find([0, 1]), [0, 0])
+        self.assertEqual(suffix_index.find([1, 0]), [0, 1])
+        self.assertEqual(suffix_index.find([1, 2]), [])
+
+    def test_find_seq_in_index(self):
+        sentences = [['b', 'a', 'b'], ['a', 'b']]
+        self.assertEqual(utils.find_seq_in_index(*utils.build_search_index(sentences), ['b', 'a b', 'c']),
+                         [['a b', [['a', 'b'], ['b', 'a', 'b']]],
+                          ['b', [['a', 'b'], ['b', 'a', 'b'], ['b', 'a', 'b']]]])
+
+    def test_index_file_round_trip(self):
+        sentences = [['b', 'a', 'b'], ['a', 'b'], ['c']]
+        temp_index = tempfile.NamedTemporaryFile(delete=False, suffix=index.INDEX_EXTENSION)
+        temp_index.close()
+        try:
+            index.write_index(temp_index.name, sentences)
+            sorted_sentences, suffix_index = index.load_index(temp_index.name)
+            self.assertEqual(utils.find_seq_in_index(sorted_sentences, suffix_index, ['a b', 'c']),
+                             utils.find_seq_in_index(*utils.build_search_index(sentences), ['a b', 'c']))
+            del sorted_sentences, suffix_index
+        finally:
+            os.remove(temp_index.name)
+
+
+class TestQueryServer(unittest.TestCase):
+
+    def setUp(self):
+        sentences = [['harry', 'met', 'ron'], ['ron', 'saw', 'hermione'], ['harry', 'slept']]
+        names = [[['harry'], []], [['ron'], []], [['hermione'], []]]
+        self.query_server = server.QueryServer(sentences, names, 1, 1)
+
+    def test_queries(self):
+        status, answer = self.query_server.dispatch('POST', '/kseq', b'{"keys": [["harry"], "ron saw"]}')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(answer, {"Question 4": {'K-Seq Matches': [
+            ['harry', [['harry', 'met', 'ron'], ['harry', 'slept']]], ['ron saw', [['ron', 'saw', 'hermione']]]]}})
+
+        body = b'{"keys": [["hermione", "harry"]], "maximal_distance": 2}'
+        self.assertEqual(self.query_server.dispatch('POST', '/indirect', body)[1],
+                         {"Question 7": [['harry', 'hermione', True]]})
+
+        body = b'{"keys": [["harry", "hermione"]], "fixed_length": 3}'
+        self.assertEqual(self.query_server.dispatch('POST', '/fixed_length', body)[1],
+                         {"Question 8": [['harry', 'hermione', True]]})
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.query_server.dispatch('POST', '/indirect', b'{"keys": []}')[0], '400 Bad Request')
+        self.assertEqual(self.query_server.dispatch('GET', '/kseq', b'')[0], '405 Method Not Allowed')
+        self.assertEqual(self.query_server.dispatch('POST', '/other', b'')[0], '404 Not Found')
+        self.assertEqual(server.parse_address('unix:/tmp/app.sock'), ('unix', '/tmp/app.sock'))
+        self.assertEqual(server.parse_address('8000'), ('127.0.0.1', 8000))
+        self.assertEqual(server.parse_address('localhost:8000'), ('localhost', 8000))
+        self.assertEqual(server.parse_address('[::1]:8000'), ('::1', 8000))
+        for address in ('0.0.0.0:8000', '192.168.1.2:8000', 'example.com:8000'):
+            with self.assertRaises(ValueError):
+                server.parse_address(address)
+
+    def request(self, *requests):
+        written = io.BytesIO()
+        writer = type('Writer', (), {'write': lambda _, data: written.write(data),
+                                     'drain': lambda _: asyncio.sleep(0), 'close': lambda _: None,
+                                     'can_write_eof': lambda _: False})()
+
+        async def connection():
+            reader = asyncio.StreamReader()
+            for request in requests:
+                reader.feed_data(request)
+            reader.feed_eof()
+            await self.query_server.handle_connection(reader, writer)
+
+        asyncio.run(connection())
+        return written.getvalue()
+
+    def test_slow_query_times_out(self):
+        self.query_server.query_timeout = 0.05
+        self.query_server.routes['/slow'] = lambda data: time.sleep(0.5) or {}
+        slow = b'POST /slow HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}'
+        fast = b'POST /kseq HTTP/1.1\r\nContent-Length: 21\r\n\r\n{"keys": ["slept"]}  '
+        answers = self.request(slow, fast)
+        self.assertTrue(answers.startswith(b'HTTP/1.1 503 Service Unavailable\r\n'))
+        self.assertIn(b'HTTP/1.1 200 OK\r\n', answers)
+        self.assertIn(b'"slept"', answers)
+
+    def test_large_body_rejected(self):
+        self.query_server.max_body_bytes = 10
+        answer = self.request(b'POST /kseq HTTP/1.1\r\nContent-Length: 11\r\n\r\n{"keys": []}',
+                              b'POST /kseq HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}')
+        self.assertTrue(answer.startswith(b'HTTP/1.1 413 Payload Too Large\r\n'))
+        self.assertIn(b'Connection: close', answer)
+        self.assertEqual(answer.count(b'HTTP/1.1'), 1)
+
+    def test_window_larger_than_corpus(self):
+        with self.assertRaises(ValueError):
+            utils.count_pair_windows([['harry']], [[['harry'], []]], 2)
+
+
+class TestSlidingWindowCooccurrence(unittest.TestCase):
+
+    def test_pair_counts(self):
+        window_counter = graph.SlidingWindowCooccurrence(2)
+        for persons in [{0}, {1}, set(), {0, 2}, {1}]:
+            window_counter.add(persons)
+        self.assertEqual(window_counter.finish(), {(0, 1): 2, (0, 2): 2, (1, 2): 1})
+        self.assertEqual(window_counter.sentences_count, 5)
+
+    def test_window_size_zero(self):
+        window_counter = graph.SlidingWindowCooccurrence(0)
+        window_counter.add({0, 1})
+        self.assertEqual(window_counter.finish(), {})
+
+    @unittest.skipUnless(importlib.util.find_spec("scipy"), "the sparse engine needs NumPy and SciPy")
+    def test_sparse_engine_matches(self):
+        sentences_persons = [{0}, {1}, set(), {0, 2}, {1}]
+        pair_counts, sentences_count = graph.sparse_window_cooccurrence(sentences_persons, 3, 2)
+        self.assertEqual(pair_counts, {(0, 1): 2, (0, 2): 2, (1, 2): 1})
+        self.assertEqual(sentences_count, 5)
+
+
+class TestReachabilityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.reachability = graph.ReachabilityIndex({'a': ['b'], 'b': ['a', 'c'], 'c': ['b'], 'd': ['e'], 'e': ['d']})
+
+    def test_components(self):
+        self.assertEqual(self.reachability.component_sizes, [3, 2])
+        self.assertFalse(self.reachability.is_connected_within('a', 'd', 10))
+        self.assertTrue(self.reachability.is_connected_within('a', 'c', 10))
+        self.assertFalse(self.reachability.is_connected_within('a', 'x', 10))
+
+    def test_bounded_distance(self):
+        self.assertFalse(self.reachability.is_connected_within('a', 'c', 1))
+        self.assertFalse(self.reachability.is_connected_within('c', 'a', 1))
+        self.assertTrue(self.reachability.is_connected_within('a', 'b', 1))
+        self.assertTrue(self.reachability.is_connected_within('a', 'a', 0))
+
+    def test_landmark_bounds_and_bidirectional_search(self):
+        path = {str(i): [str(j) for j in (i - 1, i + 1) if 0 <= j < 6] for i in range(6)}
+        reachability = graph.ReachabilityIndex(path, landmarks_count=1)
+        self.assertEqual(reachability.distance_bounds('0', '4'), (2, 4))
+        self.assertEqual(reachability.bounded_distance('0', '5', 5), 5)
+        self.assertIsNone(reachability.bounded_distance('0', '5', 4))
+        self.assertTrue(reachability.is_connected_within('1', '4', 3))
+        self.assertFalse(reachability.is_connected_within('1', '4', 2))
+
+
+class TestSimplePathFinder(unittest.TestCase):
+
+    def setUp(self):
+        # a square a-b-c-d-a with a tail d-e
+        self.graph = {'a': ['b', 'd'], 'b': ['a', 'c'], 'c': ['b', 'd'], 'd': ['c', 'a', 'e'], 'e': ['d']}
+
+    def test_exact_lengths(self):
+        for max_colour_persons in (0, 8):
+            path_finder = graph.SimplePathFinder(self.graph, max_colour_persons)
+            self.assertTrue(path_finder.has_path('a', 'e', 3))
+            # a BFS that expands d only once, through a-d, misses a-b-c-d-e
+            self.assertTrue(path_finder.has_path('a', 'e', 5))
+            self.assertFalse(path_finder.has_path('a', 'e', 4))
+            self.assertFalse(path_finder.has_path('a', 'e', 6))
+            self.assertTrue(path_finder.has_path('a', 'a', 1))
+            self.assertFalse(path_finder.has_path('a', 'x', 2))
+
+    def test_targets_of_one_source(self):
+        for max_colour_persons in (0, 8):
+            path_finder = graph.SimplePathFinder(self.graph, max_colour_persons)
+            self.assertEqual(path_finder.targets_with_path('a', ['c', 'e', 'b', 'x'], 3), {'c', 'e'})
+        path_finder = graph.SimplePathFinder(self.graph, 0)
+        self.assertEqual(utils.check_pairs_by_source(path_finder, [['a', 'c'], ['a', 'b'], ['b', 'd']], 3),
+                         [True, False, True])
+
+
+class TestCSRGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_graph = tempfile.NamedTemporaryFile(delete=False, suffix='.graph')
+        self.temp_graph.close()
+        counts = {('harry', 'ron'): 3, ('ron', 'hermione'): 2, ('harry', 'hermione'): 1, ('draco', 'ron'): 1}
+        self.people_graph = graph.CSRGraph.from_counts(counts, 2)
+
+    def tearDown(self):
+        os.remove(self.temp_graph.name)
+
+    def test_from_counts(self):
+        people_graph = self.people_graph
+        self.assertEqual(people_graph.names, ['harry', 'hermione', 'ron'])
+        ron = people_graph.node('ron')
+        self.assertEqual([people_graph.names[node] for node in people_graph[ron]], ['harry', 'hermione'])
+        self.assertEqual(list(people_graph.weights[people_graph.offsets[ron]:people_graph.offsets[ron + 1]]),
+                         [3, 2])
+        self.assertIsNone(people_graph.node('draco'))
+        self.assertNotIn(None, people_graph)
+
+    def test_file_round_trip_and_traversals(self):
+        self.people_graph.write(self.temp_graph.name)
+        people_graph = utils.load_people_graph(self.temp_graph.name)
+        self.assertEqual(people_graph.names, self.people_graph.names)
+        self.assertEqual(dict(people_graph.items()), dict(self.people_graph.items()))
+        self.assertEqual(list(people_graph.weights), list(self.people_graph.weights))
+
+        harry, hermione = people_graph.node('harry'), people_graph.node('hermione')
+        reachability = graph.ReachabilityIndex(people_graph)
+        self.assertTrue(reachability.is_connected_within(harry, hermione, 2))
+        self.assertFalse(reachability.is_connected_within(harry, hermione, 1))
+        self.assertFalse(reachability.is_connected_within(harry, people_graph.node('draco'), 5))
+        self.assertTrue(graph.SimplePathFinder(people_graph).has_path(harry, hermione, 3))
+
+    def test_truncated_file_is_invalid_input(self):
+        self.people_graph.write(self.temp_graph.name)
+        with open(self.temp_graph.name, 'rb') as file:
+            data = file.read()
+        for cut in (1, 3, 10, 30):
+            with open(self.temp_graph.name, 'wb') as file:
+                file.write(data[:-cut])
+            with patch('builtins.print') as mocked_print, self.assertRaises(SystemExit):
+                utils.load_people_graph(self.temp_graph.name)
+            mocked_print.assert_called_once_with("invalid input")
+
+    def test_unweighted_adjacency(self):
+        people_graph = graph.CSRGraph.from_adjacency({'a': ['b'], 'b': ['a'], 'c': []})
+        self.assertEqual(len(people_graph), 3)
+        self.assertIsNone(people_graph.weights)
+        self.assertEqual(list(people_graph[people_graph.node('c')]), [])
+
+
+class TestUnionFind(unittest.TestCase):
+
+    def test_union_and_groups(self):
+        components = clustering.UnionFind(5)
+        self.assertTrue(components.union(3, 1))
+        self.assertTrue(components.union(4, 1))
+        self.assertFalse(components.union(3, 4))
+        self.assertEqual(components.groups(), [[0], [1, 3, 4], [2]])
+
+    def test_from_labels(self):
+        components = clustering.UnionFind.from_labels([2, 0, 2, 1, 0])
+        self.assertEqual(components.groups(), [[0, 2], [1, 4], [3]])
+        self.assertEqual(components.sizes[0], 2)
+
+
+class TestSharedWordIndex(unittest.TestCase):
+
+    def setUp(self):
+        # word 0 is in every sentence, so it is left out of the prefixes for t >= 2
+        self.sentences = [[0, 1, 2], [0, 1, 2, 3], [0, 3, 4], [0, 4, 5, 5], [0, 6]]
+        self.shared_words = clustering.SharedWordIndex(self.sentences)
+
+    def test_pairs_match_all_pairs(self):
+        for t in range(1, 5):
+            expected = set()
+            for i in range(len(self.sentences)):
+                for j in range(i + 1, len(self.sentences)):
+                    shared = len(set(self.sentences[i]) & set(self.sentences[j]))
+                    if shared >= t:
+                        expected.add((i, j, shared))
+            self.assertEqual(set(self.shared_words.pairs(t)), expected)
+
+    def test_cluster(self):
+        self.assertEqual(self.shared_words.cluster(0).groups(), [[0, 1, 2, 3, 4]])
+        self.assertEqual(self.shared_words.cluster(1).groups(), [[0, 1, 2, 3, 4]])
+        self.assertEqual(self.shared_words.cluster(2).groups(), [[0, 1, 2, 3], [4]])
+        self.assertEqual(self.shared_words.cluster(3).groups(), [[0, 1], [2], [3], [4]])
+
+    @unittest.skipUnless(importlib.util.find_spec("scipy"), "the sparse engine needs NumPy and SciPy")
+    def test_sparse_engine_matches(self):
+        for t in range(0, 5):
+            for block_nonzeros in (1, 1 << 20):
+                components = clustering.sparse_shared_word_groups(self.sentences, t, block_nonzeros)
+                self.assertEqual(components.groups(), self.shared_words.cluster(t).groups())
+
+
+class TestMinHashLSH(unittest.TestCase):
+
+    def setUp(self):
+        self.sentences = [[0, 1, 2, 3], [0, 1, 2, 3], [0, 1, 2, 4], [5, 6, 7], [5, 6, 7, 8], [9]]
+        self.shared_words = clustering.SharedWordIndex(self.sentences)
+
+    def test_groups_are_exact_groups_or_finer(self):
+        exact = self.shared_words.cluster(2)
+        approximate = clustering.MinHashLSH(seed=1).cluster(self.shared_words, 2)
+        self.assertTrue(approximate.find(0) == approximate.find(1))
+        for i, j, _ in self.shared_words.pairs(1):
+            if approximate.find(i) == approximate.find(j):
+                self.assertEqual(exact.find(i), exact.find(j))
+
+    def test_finds_exact_groups_in_large_buckets(self):
+        # every sentence shares the word 0, and each topic is a group of near-duplicates
+        sentences = [[0] + list(range(10 * topic + 1, 10 * topic + 6)) + [1000 + 50 * topic + i]
+                     for i in range(40) for topic in range(5)]
+        shared_words = clustering.SharedWordIndex(sentences)
+        approximate = clustering.MinHashLSH(window=2).cluster(shared_words, 3)
+        self.assertEqual(approximate.groups(), shared_words.cluster(3).groups())
+        self.assertEqual(len(approximate.groups()), 5)
+
+    def test_recall_report(self):
+        report = clustering.recall_report(self.shared_words, self.shared_words.cluster(3), 3, sample_size=6)
+        self.assertEqual(report, {"Sampled Sentences": 6, "Exact Pairs": 8, "Grouped Pairs": 8, "Recall": 1.0})
+        report = clustering.recall_report(self.shared_words, clustering.UnionFind(6), 3, sample_size=6)
+        self.assertEqual(report["Grouped Pairs"], 0)
+        self.assertEqual(report["Recall"], 0.0)
+
+
+class TestSingleLinkage(unittest.TestCase):
+
+    def setUp(self):
+        sentences = [[0, 1, 2], [0, 1, 2, 3], [0, 3, 4], [0, 4, 5, 5], [0, 6]]
+        self.shared_words = clustering.SharedWordIndex(sentences)
+
+    def test_groups_at_match_cluster(self):
+        groups_by_threshold = clustering.SingleLinkage(self.shared_words, 2).groups_at([4, 2, 3, 0])
+        self.assertEqual(sorted(groups_by_threshold), [0, 2, 3, 4])
+        for t, groups in groups_by_threshold.items():
+            self.assertEqual(groups, self.shared_words.cluster(t).groups())
+
+    def test_dendrogram(self):
+        self.assertEqual(clustering.SingleLinkage(self.shared_words).dendrogram(),
+                         [[3, 0, 1, 2], [2, 2, 5, 3], [2, 3, 6, 4], [1, 4, 7, 5]])
+
+    def test_parse_thresholds(self):
+        self.assertEqual(clustering.parse_thresholds("1,3,2"), [1, 3, 2])
+        with self.assertRaises(ValueError):
+            clustering.parse_thresholds("1,-2")
+
+
+class TestStreamingJson(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {"Question 4": {"K-Seq Matches": [["a b", [["a", "b", "é"], []]], ["c", {}]],
+                                    "Counts": [1, 2.5, True, None], 3: "x"}}
+
+    def write(self, data, compact=False):
+        file = io.StringIO()
+        output.write_json(data, file, compact)
+        return file.getvalue()
+
+    def test_same_text_as_json_dumps(self):
+        self.assertEqual(self.write(self.data), json.dumps(self.data, indent=4) + '\n')
+        self.assertEqual(self.write(self.data, compact=True), json.dumps(self.data, separators=(',', ':')) + '\n')
+
+    def test_iterators_written_as_lists(self):
+        data = {"Question 5": (item for item in [["a", [["b"]]], ["c", []]])}
+        expected = {"Question 5": [["a", [["b"]]], ["c", []]]}
+        self.assertEqual(self.write(data), json.dumps(expected, indent=4) + '\n')
+        self.assertEqual(self.write({"Question 5": iter([])}), json.dumps({"Question 5": []}, indent=4) + '\n')
+
+    def test_sentence_table(self):
+        table = output.SentenceTable()
+        self.assertEqual([table.add(["a", "b"]), table.add(("c",)), table.add(("a", "b"))], [0, 1, 0])
+        data = {"Sentences": table.sentences()}
+        table.add(["d"])
+        self.assertEqual(self.write(data), json.dumps({"Sentences": [["a", "b"], ["c"], ["d"]]}, indent=4) + '\n')
+
+    def test_seq_ids_in_index(self):
+        sorted_sentences, suffix_index = utils.build_search_index([["b", "a"], ["a", "c"], ["b", "a"], ["c"]])
+        expected = utils.find_seq_in_index(sorted_sentences, suffix_index, ["a", "b a", "c"])
+        table = output.SentenceTable()
+        matches = list(utils.iter_seq_in_index(sorted_sentences, suffix_index, ["a", "b a", "c"], table))
+        sentences = [list(sentence) for sentence in table.sentences()]
+        self.assertEqual(len(sentences), 3)
+        self.assertEqual([[seq, [sentences[i] for i in ids]] for seq, ids in matches], expected)
+
+    def test_output_file_kept_when_a_run_fails(self):
+        def failing_results():
+            yield ["a", []]
+            raise ValueError
+
+        temp_dir = tempfile.mkdtemp()
+        path = os.path.join(temp_dir, "out.json")
+        try:
+            output.configure(path, False)
+            output.print_json(self.data)
+            with self.assertRaises(ValueError):
+                output.print_json({"Question 5": failing_results()})
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(file.read(), json.dumps(self.data, indent=4) + '\n')
+            self.assertEqual(os.listdir(temp_dir), ["out.json"])
+        finally:
+            output.configure(None, False)
+            shutil.rmtree(temp_dir)
+
+
 if __name__ == '__main__':
     unittest.main()